@@ -0,0 +1,120 @@
+import os
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from benchmarks.common import (
+    load_catalog, normalize, exact_top_k, recall_at_k, latency_summary, write_report, build_collection, run_queries,
+)
+from db.vectors import search_params
+
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QUERIES = int(os.getenv("BENCH_QUERIES", "200"))
+# Recall is reported at every k; 30 matches MAXIMUM_MOVIES_CANDIDATES
+K_VALUES = [int(k) for k in os.getenv("BENCH_K", "10,30").split(",")]
+BACKENDS = os.getenv("BENCH_BACKENDS", "numpy,qdrant,qdrant-memory").split(",")
+M_VALUES = [int(m) for m in os.getenv("BENCH_M", "8,16,32").split(",")]
+EF_VALUES = [int(ef) for ef in os.getenv("BENCH_EF", "32,64,128,256").split(",")]
+QUANTIZATIONS = os.getenv("BENCH_QUANTIZATION", "none,scalar,binary").split(",")
+REPORT_FILE = os.getenv("BENCH_REPORT", "reports/ann.json")
+
+
+def summarize(config: dict, ids: list, expected_rows: np.ndarray, found: list, latencies: list) -> dict:
+    total = sum(latencies)
+    recall = {
+        f"recall_at_{k}": round(recall_at_k(
+            [set(ids[row] for row in rows[:k]) for rows in expected_rows],
+            [result[:k] for result in found],
+        ), 4)
+        for k in K_VALUES
+    }
+    result = {
+        **config,
+        **recall,
+        "latency": latency_summary(latencies),
+        "qps": round(len(latencies) / total, 1) if total > 0 else None,
+    }
+    print(
+        " ".join(f"{key}={value}" for key, value in config.items()) + " " +
+        " ".join(f"{key}={value:.3f}" for key, value in recall.items()) +
+        f" p50={result['latency']['p50_ms']}ms p99={result['latency']['p99_ms']}ms qps={result['qps']}"
+    )
+    return result
+
+
+def benchmark_numpy(ids, vectors, queries, expected_rows) -> list[dict]:
+    """
+    Exact brute-force search with a matrix-vector product per query.
+    """
+    matrix = normalize(vectors)
+    limit = max(K_VALUES)
+    found, latencies = [], []
+    for query in normalize(queries):
+        start = time.perf_counter()
+        scores = matrix @ query
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        latencies.append(time.perf_counter() - start)
+        found.append([ids[row] for row in top])
+    return [summarize({"backend": "numpy"}, ids, expected_rows, found, latencies)]
+
+
+def benchmark_qdrant(client: QdrantClient, backend: str, ids, vectors, queries, expected_rows,
+                     m_values, ef_values, quantizations) -> list[dict]:
+    """
+    Build one collection per (m, quantization) and search it with every ef.
+    """
+    results = []
+    limit = max(K_VALUES)
+    for quantization in quantizations:
+        for m in m_values:
+            collection = f"bench_ann_m{m}_{quantization}"
+            build_collection(client, collection, ids, vectors, quantization=quantization, m=m)
+            try:
+                for ef in ef_values:
+                    params = search_params(quantization, hnsw_ef=ef)
+                    found, latencies = run_queries(client, collection, queries, limit, params)
+                    config = {"backend": backend, "m": m, "ef": ef, "quantization": quantization}
+                    results.append(summarize(config, ids, expected_rows, found, latencies))
+            finally:
+                client.delete_collection(collection)
+    return results
+
+
+def main():
+    catalog = load_catalog()
+    ids = catalog.ids.tolist()
+    vectors = np.ascontiguousarray(catalog.embeddings, dtype=np.float32)
+    query_rows = np.random.default_rng(0).choice(len(ids), size=min(QUERIES, len(ids)), replace=False)
+    queries = np.array(vectors[query_rows])
+    print(f"Calculando top-{max(K_VALUES)} exacto para {len(queries)} consultas sobre {len(ids)} películas...")
+    expected_rows = exact_top_k(vectors, queries, max(K_VALUES))
+
+    results = []
+    for backend in BACKENDS:
+        if backend == "numpy":
+            results += benchmark_numpy(ids, vectors, queries, expected_rows)
+        elif backend == "qdrant":
+            client = QdrantClient(location=QDRANT_URL)
+            results += benchmark_qdrant(client, backend, ids, vectors, queries, expected_rows,
+                                        M_VALUES, EF_VALUES, QUANTIZATIONS)
+        elif backend == "qdrant-memory":
+            # The local in-memory mode searches exhaustively and ignores index settings
+            client = QdrantClient(location=":memory:")
+            results += benchmark_qdrant(client, backend, ids, vectors, queries, expected_rows,
+                                        [M_VALUES[0]], [EF_VALUES[0]], ["none"])
+        else:
+            raise ValueError(f"Unknown backend '{backend}'")
+
+    write_report({
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "catalog_version": catalog.version,
+        "count": len(ids),
+        "dimension": vectors.shape[1],
+        "queries": len(queries),
+        "k": K_VALUES,
+        "results": results,
+    }, REPORT_FILE)
+
+
+if __name__ == "__main__":
+    main()
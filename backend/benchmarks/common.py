@@ -0,0 +1,112 @@
+import json
+import os
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from catalog.snapshot import CatalogSnapshot, open_default_snapshot
+from db.vectors import create_movies_collection, HNSW_M
+
+INPUT_FILE = "movies_data.json"
+
+
+def load_catalog(input_file: str = INPUT_FILE) -> CatalogSnapshot:
+    """
+    Load the catalog from the configured snapshot, or build one in memory from the JSON file.
+    """
+    snapshot = open_default_snapshot()
+    if snapshot is not None:
+        return snapshot
+    with open(input_file, encoding="utf-8") as f:
+        return CatalogSnapshot.from_movies(json.load(f))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, block_size: int = 256) -> np.ndarray:
+    """
+    Exact cosine top-k of every query by blocked matrix products.
+
+    Args:
+        vectors (np.ndarray): The (n, dim) catalog matrix.
+        queries (np.ndarray): The (q, dim) query matrix.
+        k (int): Number of neighbours.
+        block_size (int): Queries per matrix product, to bound memory.
+
+    Returns:
+        np.ndarray: (q, k) row indices into `vectors`, best first.
+    """
+    matrix = normalize(vectors)
+    queries = normalize(queries)
+    k = min(k, len(matrix))
+    result = np.empty((len(queries), k), dtype=np.int64)
+    for start in range(0, len(queries), block_size):
+        scores = queries[start:start + block_size] @ matrix.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        result[start:start + block_size] = np.take_along_axis(top, order, axis=1)
+    return result
+
+
+def recall_at_k(expected: list[set], found: list[list]) -> float:
+    """
+    Mean fraction of the expected neighbours present in the found ones.
+    """
+    if not expected:
+        return 1.0
+    return float(np.mean([len(e.intersection(f)) / max(len(e), 1) for e, f in zip(expected, found)]))
+
+
+def latency_summary(seconds: list[float]) -> dict:
+    """
+    Summarize latency samples in milliseconds.
+    """
+    samples = np.asarray(seconds) * 1000
+    if len(samples) == 0:
+        return {"count": 0}
+    return {
+        "count": int(len(samples)),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def build_collection(client: QdrantClient, collection: str, ids: list, vectors: np.ndarray,
+                     quantization: str = "none", m: int = HNSW_M):
+    """
+    (Re)create a benchmark collection and upload every vector, waiting until it is indexed.
+    """
+    from upload_to_qdrant import wait_until_consistent
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    create_movies_collection(client, collection, vectors.shape[1], quantization=quantization, m=m)
+    client.upload_collection(collection_name=collection, vectors=vectors, ids=ids, batch_size=256, wait=True)
+    wait_until_consistent(client, collection, len(ids))
+
+
+def run_queries(client: QdrantClient, collection: str, queries: np.ndarray, limit: int, params=None) -> tuple[list, list]:
+    """
+    Run one search per query, sequentially, timing each one.
+
+    Returns:
+        tuple[list, list]: The found IDs of every query and the latency of every query in seconds.
+    """
+    found, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        points = client.search(collection_name=collection, query_vector=np.array(query), limit=limit,
+                               search_params=params, with_payload=False)
+        latencies.append(time.perf_counter() - start)
+        found.append([point.id for point in points])
+    return found, latencies
+
+
+def write_report(report: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Reporte escrito en {path}")
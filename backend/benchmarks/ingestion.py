@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import numpy as np
+
+SIZES = [int(size) for size in os.getenv("INGEST_SIZES", "1000,10000").split(",")]
+DIMENSION = int(os.getenv("INGEST_DIMENSION", "768"))
+STAGES = os.getenv("INGEST_STAGES", "postgres,snapshot,qdrant").split(",")
+SEED = int(os.getenv("INGEST_SEED", "0"))
+WORKDIR = os.path.abspath(os.getenv("INGEST_WORKDIR", "reports/ingestion"))
+# SQLite in the work directory and in-memory Qdrant unless URLs are given, so the benchmark runs offline
+DATABASE_URL = os.getenv("INGEST_DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'ingestion.db')}")
+QDRANT_URL = os.getenv("INGEST_QDRANT_URL", ":memory:")
+REPORT_FILE = os.getenv("BENCH_REPORT", "reports/ingestion.json")
+
+# Set before importing anything from db/ (which reads them at import time), so neither this
+# process nor the spawned loaders, which re-import this module, touch the live `movies` alias
+os.environ.update({
+    "DATABASE_URL": DATABASE_URL,
+    "QDRANT_URL": QDRANT_URL,
+    "QDRANT_COLLECTION": "ingestion_movies",
+})
+if QDRANT_URL == ":memory:":
+    # The in-memory store cannot be shared with upload worker processes
+    os.environ["QDRANT_UPLOAD_PARALLEL"] = "1"
+
+from benchmarks.common import write_report
+
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_stage(stage: str, size: int, results):
+    """
+    Loader process: generate the catalog, then time one loader stage on it.
+
+    Each stage runs in its own process so its peak RSS is not inflated by the previous ones,
+    and with its own snapshot path: publishing the catalog after the Postgres load rewrites an
+    existing snapshot, which would otherwise be timed as part of the Postgres stage.
+    """
+    os.environ["CATALOG_SNAPSHOT"] = os.path.join(WORKDIR, f"snapshot-{stage}-{size}")
+    from benchmarks.synthetic import make_movies
+
+    movies = make_movies(size, DIMENSION, SEED)
+    if stage == "postgres":
+        # As loaded from movies_data.json
+        for movie in movies:
+            movie["embeddings"] = movie["embeddings"].tolist()
+    rss_before = peak_rss_bytes()
+
+    start = time.perf_counter()
+    if stage == "postgres":
+        from upload_to_postgres import upload_movies_to_postgres
+        upload_movies_to_postgres(movies)
+        unit = "rows"
+    elif stage == "snapshot":
+        from catalog.snapshot import write_snapshot
+        write_snapshot(movies, os.environ["CATALOG_SNAPSHOT"])
+        unit = "rows"
+    elif stage == "qdrant":
+        from upload_to_qdrant import prepare_points, upload_to_qdrant
+        ids, vectors, payloads = prepare_points(movies)
+        upload_to_qdrant(ids, vectors, payloads)
+        unit = "points"
+    else:
+        raise ValueError(f"Unknown stage '{stage}'")
+    seconds = time.perf_counter() - start
+
+    results.put({
+        "stage": stage,
+        "size": size,
+        "dimension": DIMENSION,
+        "seconds": round(seconds, 3),
+        f"{unit}_per_second": round(size / seconds, 1) if seconds > 0 else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "peak_rss_before_stage_bytes": rss_before,
+    })
+
+
+def benchmark_stage(stage: str, size: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_stage, args=(stage, size, results))
+    process.start()
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=1)
+        except Exception:
+            if not process.is_alive():
+                raise Exception(f"La etapa {stage} falló con {size} películas (código {process.exitcode}).")
+    process.join()
+    rate = result.get("rows_per_second") or result.get("points_per_second")
+    print(
+        f"stage={stage} size={size} seconds={result['seconds']} rate={rate}/s "
+        f"peak_rss={result['peak_rss_bytes'] / 2**20:.0f}MiB"
+    )
+    return result
+
+
+def main():
+    os.makedirs(WORKDIR, exist_ok=True)
+    results = [benchmark_stage(stage, size) for size in SIZES for stage in STAGES]
+    write_report({
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "database": DATABASE_URL.split("://")[0],
+        "vector_store": "qdrant-memory" if QDRANT_URL == ":memory:" else "qdrant",
+        "results": results,
+    }, REPORT_FILE)
+
+
+if __name__ == "__main__":
+    main()
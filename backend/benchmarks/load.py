@@ -0,0 +1,250 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+import httpx
+import numpy as np
+from datetime import date
+from benchmarks.common import latency_summary, write_report
+from benchmarks.synthetic import GENRES
+
+SIZES = [int(size) for size in os.getenv("LOAD_SIZES", "10000").split(",")]
+DIMENSION = int(os.getenv("LOAD_DIMENSION", "384"))
+CONCURRENCY = [int(level) for level in os.getenv("LOAD_CONCURRENCY", "1,8,32").split(",")]
+REQUESTS = int(os.getenv("LOAD_REQUESTS", "1000"))
+WARMUP_REQUESTS = int(os.getenv("LOAD_WARMUP", "50"))
+SEED = int(os.getenv("LOAD_SEED", "0"))
+WORKDIR = os.path.abspath(os.getenv("LOAD_WORKDIR", "reports/load"))
+# SQLite in the work directory unless a (PostgreSQL) URL is given; in-memory Qdrant unless a URL is given
+DATABASE_URL = os.getenv("LOAD_DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'load.db')}")
+QDRANT_URL = os.getenv("LOAD_QDRANT_URL", ":memory:")
+QDRANT_COLLECTION = os.getenv("LOAD_QDRANT_COLLECTION", "load_movies")
+PORT = int(os.getenv("LOAD_PORT", "8765"))
+READY_TIMEOUT = float(os.getenv("LOAD_READY_TIMEOUT", "3600"))
+REPORT_FILE = os.getenv("BENCH_REPORT", "reports/load.json")
+
+
+def seed_database(movies: list[dict], chunk_size: int = 5000):
+    """
+    Recreate the tables and bulk-load a synthetic catalog, with its rankings and a new catalog version.
+
+    Uses multi-row inserts instead of the row-by-row upload scripts so large catalogs load quickly.
+    Embeddings are not stored: the API reads them from the snapshot. The database modules are
+    imported here because they connect on import, after `serve` configured DATABASE_URL.
+    """
+    from sqlalchemy import insert
+    from catalog.snapshot import VALID_CERTIFICATIONS
+    from db.db import init_db, SessionLocal
+    from db.movies import Movie, Genre, Certification, movie_genre
+    from db.rankings import refresh_popular_rankings
+    from db.versions import bump_catalog_version
+
+    init_db()
+    session = SessionLocal()
+    try:
+        session.execute(insert(Certification), [
+            {"certification": name, "min_age": age} for name, age in VALID_CERTIFICATIONS.items()
+        ])
+        genre_names = sorted({genre for movie in movies for genre in movie["genres"]})
+        session.execute(insert(Genre), [{"name": name} for name in genre_names])
+        certification_ids = {c.certification: c.id for c in session.query(Certification)}
+        genre_ids = {g.name: g.id for g in session.query(Genre)}
+
+        for start in range(0, len(movies), chunk_size):
+            chunk = movies[start:start + chunk_size]
+            session.execute(insert(Movie), [
+                {
+                    "id": movie["id"],
+                    "title": movie["title"],
+                    "overview": movie["overview"],
+                    "release_date": date.fromisoformat(movie["release_date"]) if movie["release_date"] else None,
+                    "popularity": movie["popularity"],
+                    "vote_average": movie["vote_average"],
+                    "vote_count": movie["vote_count"],
+                    "poster_path": movie["poster_path"],
+                    "backdrop_path": movie["backdrop_path"],
+                    "certification_id": certification_ids.get(movie["certification"]),
+                }
+                for movie in chunk
+            ])
+            session.execute(insert(movie_genre), [
+                {"movie_id": movie["id"], "genre_id": genre_ids[genre]} for movie in chunk for genre in movie["genres"]
+            ])
+        session.commit()
+        refresh_popular_rankings(session)
+        bump_catalog_version(session, "benchmarks")
+    finally:
+        session.close()
+
+
+def seed_vectors(ids: list[int], vectors: np.ndarray, batch_size: int = 1000):
+    """
+    Load the synthetic vectors into the collection the API searches.
+
+    The in-memory store only exists inside this process, so it is filled through the same
+    shared client the API uses; a Qdrant server is filled with the regular sync client.
+    """
+    from qdrant_client import QdrantClient as SyncQdrantClient
+    from qdrant_client.models import VectorParams, Distance, Batch
+    from repositories.recommendations import QdrantClient
+
+    if QDRANT_URL != ":memory:":
+        client = SyncQdrantClient(url=QDRANT_URL)
+        if client.collection_exists(QDRANT_COLLECTION):
+            client.delete_collection(QDRANT_COLLECTION)
+        client.create_collection(QDRANT_COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+        client.upload_collection(QDRANT_COLLECTION, vectors=vectors, ids=ids, batch_size=batch_size, wait=True)
+        return
+
+    async def upload():
+        client = QdrantClient(url=QDRANT_URL).qdrant_client
+        await client.create_collection(QDRANT_COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+        for start in range(0, len(ids), batch_size):
+            await client.upsert(QDRANT_COLLECTION, points=Batch(
+                ids=ids[start:start + batch_size], vectors=vectors[start:start + batch_size].tolist()
+            ))
+    asyncio.run(upload())
+
+
+def serve(size: int):
+    """
+    Server process: seed the database, snapshot and vector store with a synthetic catalog, then run the API.
+    """
+    os.environ.update({
+        "DATABASE_URL": DATABASE_URL,
+        "QDRANT_URL": QDRANT_URL,
+        "QDRANT_COLLECTION": QDRANT_COLLECTION,
+        "CATALOG_SNAPSHOT": os.path.join(WORKDIR, "snapshot"),
+    })
+    from benchmarks.synthetic import make_movies
+    from catalog.snapshot import write_snapshot
+
+    start = time.perf_counter()
+    movies = make_movies(size, DIMENSION, SEED)
+    seed_database(movies)
+    snapshot = write_snapshot(movies, os.environ["CATALOG_SNAPSHOT"])
+    seed_vectors(snapshot.ids.tolist(), np.asarray(snapshot.embeddings))
+    del movies
+    with open(os.path.join(WORKDIR, f"seed-{size}.json"), "w", encoding="utf-8") as f:
+        json.dump({"seed_seconds": round(time.perf_counter() - start, 2)}, f)
+
+    import uvicorn
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=PORT, log_level="warning")
+
+
+def wait_until_ready(process: multiprocessing.Process, base_url: str, timeout: float = READY_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not process.is_alive():
+            raise Exception(f"El servidor terminó antes de estar listo (código {process.exitcode}).")
+        try:
+            if httpx.get(f"{base_url}/metrics", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise Exception(f"El servidor no estuvo listo en {timeout:.0f} segundos.")
+
+
+def listing_request(rng: np.random.Generator, size: int) -> tuple:
+    genres = rng.choice(GENRES, size=rng.choice([0, 1, 2], p=[0.5, 0.35, 0.15]), replace=False).tolist()
+    return "POST", "/api/movies", {
+        "page": int(min(rng.zipf(1.5), 20)),
+        "page_size": 20,
+        "genres": genres,
+        "maximum_certification": rng.choice([None, "G", "PG-13", "R"]),
+    }
+
+
+def movie_request(rng: np.random.Generator, size: int) -> tuple:
+    certification = rng.choice([None, "PG-13", "R"])
+    path = f"/api/movies/{int(rng.integers(1, size + 1))}"
+    return "GET", path + (f"?maximum_certification={certification}" if certification else ""), None
+
+
+SCENARIOS = {"listing": listing_request, "movie": movie_request}
+
+
+async def drive(base_url: str, make_request, size: int, concurrency: int, total: int, seed: int) -> dict:
+    """
+    Send `total` requests with `concurrency` concurrent clients and measure them.
+
+    Returns:
+        dict: Throughput, error count and latency percentiles.
+    """
+    rng = np.random.default_rng(seed)
+    requests = [make_request(rng, size) for _ in range(total)]
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        pending = iter(requests)
+
+        async def worker():
+            nonlocal errors
+            for method, path, body in pending:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    failed = response.status_code >= 500
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append(time.perf_counter() - start)
+                errors += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "latency": latency_summary(latencies),
+    }
+
+
+def benchmark_size(size: int) -> dict:
+    base_url = f"http://127.0.0.1:{PORT}"
+    process = multiprocessing.get_context("spawn").Process(target=serve, args=(size,), daemon=True)
+    print(f"Generando y cargando un catálogo sintético de {size} películas (dimensión {DIMENSION})...")
+    process.start()
+    try:
+        wait_until_ready(process, base_url)
+        with open(os.path.join(WORKDIR, f"seed-{size}.json"), encoding="utf-8") as f:
+            result = {"size": size, "dimension": DIMENSION, **json.load(f), "scenarios": {}}
+        for name, make_request in SCENARIOS.items():
+            asyncio.run(drive(base_url, make_request, size, max(CONCURRENCY), WARMUP_REQUESTS, SEED + 1))
+            result["scenarios"][name] = []
+            for concurrency in CONCURRENCY:
+                measured = asyncio.run(drive(base_url, make_request, size, concurrency, REQUESTS, SEED))
+                result["scenarios"][name].append(measured)
+                print(
+                    f"size={size} {name} concurrency={concurrency} rps={measured['throughput_rps']} "
+                    f"p50={measured['latency']['p50_ms']}ms p95={measured['latency']['p95_ms']}ms "
+                    f"p99={measured['latency']['p99_ms']}ms errors={measured['errors']}"
+                )
+        return result
+    finally:
+        process.terminate()
+        process.join()
+
+
+def main():
+    os.makedirs(WORKDIR, exist_ok=True)
+    results = [benchmark_size(size) for size in SIZES]
+    write_report({
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "database": DATABASE_URL.split("://")[0],
+        "vector_store": "qdrant-memory" if QDRANT_URL == ":memory:" else "qdrant",
+        "requests": REQUESTS,
+        "concurrency": CONCURRENCY,
+        "results": results,
+    }, REPORT_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import numpy as np
+from qdrant_client import QdrantClient
+from benchmarks.common import (
+    load_catalog, exact_top_k, recall_at_k, latency_summary, write_report, build_collection, run_queries,
+)
+from db.vectors import QUANTIZATION_MODES, search_params, estimate_memory, QDRANT_OVERSAMPLING
+
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QUERIES = int(os.getenv("BENCH_QUERIES", "200"))
+K = 10
+REPORT_FILE = os.getenv("BENCH_REPORT", "reports/quantization.json")
+
+
+def benchmark_quantization(client: QdrantClient, ids, vectors, query_rows, quantization: str) -> dict:
+    """
+    Build a throwaway collection with a quantization mode and measure recall@10, latency and memory.
+    """
+    collection = f"bench_quantization_{quantization}"
+    build_collection(client, collection, ids, vectors, quantization=quantization)
+    try:
+        expected = [set(ids[row] for row in rows) for rows in exact_top_k(vectors, vectors[query_rows], K)]
+        found, latencies = run_queries(client, collection, vectors[query_rows], K, search_params(quantization))
+        return {
+            "quantization": quantization,
+            "oversampling": QDRANT_OVERSAMPLING if quantization != "none" else None,
+            "recall_at_10": round(recall_at_k(expected, found), 4),
+            "latency": latency_summary(latencies),
+            "memory": estimate_memory(len(ids), vectors.shape[1], quantization),
+        }
+    finally:
+        client.delete_collection(collection)
+
+
+def main():
+    catalog = load_catalog()
+    ids = catalog.ids.tolist()
+    vectors = np.ascontiguousarray(catalog.embeddings, dtype=np.float32)
+    query_rows = np.random.default_rng(0).choice(len(ids), size=min(QUERIES, len(ids)), replace=False)
+    client = QdrantClient(location=QDRANT_URL)
+
+    results = [benchmark_quantization(client, ids, vectors, query_rows, mode) for mode in QUANTIZATION_MODES]
+    baseline = results[0]["memory"]["ram_bytes"]
+    for result in results:
+        result["ram_savings"] = round(1 - result["memory"]["ram_bytes"] / baseline, 4)
+        print(
+            f"{result['quantization']:>6}: recall@10={result['recall_at_10']:.3f} "
+            f"p50={result['latency']['p50_ms']}ms p95={result['latency']['p95_ms']}ms "
+            f"RAM={result['memory']['ram_bytes'] / 2**20:.1f} MiB ({result['ram_savings']:.0%} menos)"
+        )
+    write_report({"count": len(ids), "dimension": vectors.shape[1], "queries": len(query_rows), "results": results}, REPORT_FILE)
+
+
+if __name__ == "__main__":
+    main()
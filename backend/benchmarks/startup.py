@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from benchmarks.common import write_report
+
+# Budgets for `import main` in a fresh interpreter; the script exits with an error when one is exceeded
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "3"))
+RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", "250"))
+RUNS = int(os.getenv("STARTUP_RUNS", "3"))
+TOP_IMPORTS = int(os.getenv("STARTUP_TOP_IMPORTS", "15"))
+# Modules that must only be imported when first used, never when the API starts
+FORBIDDEN_MODULES = ("torch", "sentence_transformers", "transformers")
+REPORT_FILE = os.getenv("BENCH_REPORT", "reports/startup.json")
+
+CHILD = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": seconds,
+    "peak_rss_bytes": peak if sys.platform == "darwin" else peak * 1024,
+    "forbidden": [name for name in {FORBIDDEN_MODULES!r} if name in sys.modules],
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """
+    Parse the `-X importtime` output into the modules imported directly by top-level imports
+    (such as `main`), slowest first.
+
+    Nested imports are indented under their importer; their time is included in its cumulative time.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # "import time:   self |   cumulative | <two spaces per nesting level>module"
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth != 1:
+            continue
+        imports.append({"module": name.strip(), "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+                        "self_ms": round(int(self_us) / 1000, 1)})
+    return sorted(imports, key=lambda item: -item["cumulative_ms"])
+
+
+def measure() -> dict:
+    """
+    Import the API in a fresh interpreter and measure it.
+    """
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if process.returncode != 0:
+        raise Exception(f"No se pudo importar la API:\n{process.stderr[-2000:]}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = time.perf_counter() - start
+    result["imports"] = parse_importtime(process.stderr)
+    return result
+
+
+def main():
+    runs = [measure() for _ in range(RUNS)]
+    # The first run may compile bytecode; the budget applies to the fastest one
+    best = min(runs, key=lambda run: run["seconds"])
+    peak_rss_mb = max(run["peak_rss_bytes"] for run in runs) / 2**20
+    failures = []
+    if best["seconds"] > IMPORT_BUDGET_SECONDS:
+        failures.append(f"importar la API tarda {best['seconds']:.2f}s (presupuesto {IMPORT_BUDGET_SECONDS}s)")
+    if peak_rss_mb > RSS_BUDGET_MB:
+        failures.append(f"la memoria tras importar es {peak_rss_mb:.0f}MiB (presupuesto {RSS_BUDGET_MB}MiB)")
+    if best["forbidden"]:
+        failures.append(f"se importan al arrancar: {', '.join(best['forbidden'])}")
+
+    print(f"import main: {best['seconds']:.3f}s, peak_rss={peak_rss_mb:.0f}MiB, modules={best['modules']}")
+    for item in best["imports"][:TOP_IMPORTS]:
+        print(f"  {item['cumulative_ms']:>8.1f}ms  {item['module']}")
+    write_report({
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "budget": {"import_seconds": IMPORT_BUDGET_SECONDS, "rss_mb": RSS_BUDGET_MB},
+        "import_seconds": [round(run["seconds"], 3) for run in runs],
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "modules": best["modules"],
+        "forbidden_modules": best["forbidden"],
+        "top_imports": best["imports"][:TOP_IMPORTS],
+        "failures": failures,
+    }, REPORT_FILE)
+    if failures:
+        for failure in failures:
+            print(f"Fuera de presupuesto: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
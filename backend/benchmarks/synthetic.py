@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+from datetime import date
+import numpy as np
+
+# TMDB movie genres, as returned in Spanish, weighted by how often they appear in the popular catalog
+GENRE_WEIGHTS = {
+    "Drama": 0.20, "Comedia": 0.13, "Suspense": 0.09, "Acción": 0.09, "Terror": 0.07, "Romance": 0.06,
+    "Aventura": 0.05, "Crimen": 0.05, "Ciencia ficción": 0.04, "Fantasía": 0.04, "Animación": 0.04,
+    "Familia": 0.04, "Misterio": 0.03, "Documental": 0.02, "Historia": 0.02, "Música": 0.01,
+    "Película de TV": 0.01, "Bélica": 0.01, "Western": 0.005,
+}
+GENRES = list(GENRE_WEIGHTS)
+# Share of movies with 1, 2, 3 and 4 genres
+GENRE_COUNT_WEIGHTS = (0.35, 0.40, 0.20, 0.05)
+# US certifications of the catalog; TV ratings are rare for movies
+CERTIFICATION_WEIGHTS = {
+    "R": 0.36, "PG-13": 0.27, "PG": 0.16, "G": 0.04, "NC-17": 0.01,
+    "TV-MA": 0.06, "TV-14": 0.05, "TV-PG": 0.03, "TV-G": 0.02,
+}
+TITLE_WORDS = [
+    "noche", "ciudad", "último", "amor", "guerra", "sombra", "regreso", "secreto", "viaje", "reino", "fuego",
+    "camino", "héroe", "misión", "sueño", "invierno", "río", "estrella", "silencio", "venganza",
+]
+
+
+def make_movies(count: int, dimension: int, seed: int = 0) -> list[dict]:
+    """
+    Generate a synthetic catalog in the `movies_data.json` shape, with random unit embeddings,
+    long-tailed popularity and the genre and certification mix of the TMDB catalog.
+
+    Embeddings are rows of one (count, dimension) float32 matrix rather than lists, so large
+    catalogs fit in memory.
+
+    Args:
+        count (int): Number of movies; IDs go from 1 to `count`.
+        dimension (int): Dimension of the embeddings.
+        seed (int): Random seed.
+
+    Returns:
+        list[dict]: The movies.
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((count, dimension), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    popularity = rng.pareto(1.5, count) * 10
+    words = rng.integers(0, len(TITLE_WORDS), size=(count, 2))
+    genre_counts = rng.choice(len(GENRE_COUNT_WEIGHTS), size=count, p=GENRE_COUNT_WEIGHTS) + 1
+    genre_weights = np.array(list(GENRE_WEIGHTS.values()))
+    genre_weights /= genre_weights.sum()
+    certifications = list(CERTIFICATION_WEIGHTS)
+    certification_weights = np.array(list(CERTIFICATION_WEIGHTS.values()))
+    certification_choices = rng.choice(len(certifications), size=count, p=certification_weights / certification_weights.sum())
+    days = rng.integers(0, 365 * 50, size=count)
+
+    movies = []
+    for row in range(count):
+        movies.append({
+            "id": row + 1,
+            "title": f"{TITLE_WORDS[words[row, 0]].capitalize()} {TITLE_WORDS[words[row, 1]]} {row + 1}",
+            "overview": f"Una historia de {TITLE_WORDS[words[row, 1]]} y {TITLE_WORDS[words[row, 0]]}.",
+            "release_date": date.fromordinal(date(1975, 1, 1).toordinal() + int(days[row])).isoformat(),
+            "popularity": float(popularity[row]),
+            "vote_average": round(float(rng.uniform(3, 9)), 1),
+            "vote_count": int(rng.integers(0, 20000)),
+            "poster_path": f"/poster{row + 1}.jpg",
+            "backdrop_path": f"/backdrop{row + 1}.jpg",
+            "certification": certifications[certification_choices[row]],
+            "genres": [GENRES[index] for index in rng.choice(len(GENRES), genre_counts[row], replace=False, p=genre_weights)],
+            "embeddings": embeddings[row],
+        })
+    return movies
+
+
+def write_movies(movies: list[dict], path: str):
+    """
+    Write movies as `movies_data.json`, one movie at a time so large catalogs are never held as one string.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for index, movie in enumerate(movies):
+            f.write(",\n" if index else "\n")
+            json.dump({**movie, "embeddings": np.asarray(movie["embeddings"]).tolist()}, f, ensure_ascii=False)
+        f.write("\n]\n")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    output = sys.argv[2] if len(sys.argv) > 2 else "movies_data.json"
+    dimension = int(os.getenv("SYNTHETIC_DIMENSION", "768"))
+    movies = make_movies(count, dimension, int(os.getenv("SYNTHETIC_SEED", "0")))
+    write_movies(movies, output)
+    print(f"Se generaron {count} películas sintéticas (dimensión {dimension}) en {output}.")
+
+
+if __name__ == "__main__":
+    main()
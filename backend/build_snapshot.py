@@ -0,0 +1,18 @@
+import json
+import os
+import time
+from catalog.snapshot import write_snapshot, DEFAULT_SNAPSHOT_PATH, SNAPSHOT_NEIGHBOURS
+
+INPUT_FILE = "movies_data.json"
+SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+
+def main():
+    start_time = time.time()
+    with open(INPUT_FILE, encoding='utf-8') as f:
+        movies = json.load(f)
+    snapshot = write_snapshot(movies, SNAPSHOT_PATH, neighbours=SNAPSHOT_NEIGHBOURS)
+    end_time = time.time()
+    print(f"Snapshot {snapshot.version} escrito en {SNAPSHOT_PATH}: {len(snapshot)} películas, dimensión {snapshot.dimension} ({end_time - start_time:.2f} segundos).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import numpy as np
+from catalog.snapshot import CatalogSnapshot
+
+
+class MovieRecord:
+    """
+    Lightweight view of one movie of the listing engine; fields are read from the columns on access.
+    """
+
+    __slots__ = ("engine", "position")
+
+    def __init__(self, engine: "CatalogEngine", position: int):
+        self.engine = engine
+        self.position = position
+
+    @property
+    def row(self) -> int:
+        return int(self.engine.rows[self.position])
+
+    @property
+    def id(self) -> int:
+        return int(self.engine.ids[self.position])
+
+    @property
+    def title(self) -> str:
+        return self.engine.snapshot.columns["title"][self.row]
+
+    @property
+    def release_date(self) -> str | None:
+        return self.engine.snapshot.columns["release_date"][self.row]
+
+    @property
+    def poster_path(self) -> str | None:
+        return self.engine.snapshot.columns["poster_path"][self.row]
+
+    @property
+    def certification(self) -> str | None:
+        return self.engine.snapshot.certification(self.row)
+
+    @property
+    def popularity(self) -> float:
+        return float(self.engine.popularity[self.position])
+
+    @property
+    def genres(self) -> list[str]:
+        return self.engine.snapshot.genre_names(self.row)
+
+
+class CatalogEngine:
+    """
+    Columnar, in-process engine answering the movie listing queries.
+
+    Columns are reordered by descending popularity once, so a listing page is a slice of the
+    positions matching the filters. Every genre and every certification ceiling has a packed
+    bitset over those positions: a filter is the AND of a few bitsets and its total is a
+    popcount.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.size = len(snapshot)
+        self.rows = np.argsort(-np.asarray(snapshot.popularity), kind="stable").astype(np.int32)
+        self.ids = np.asarray(snapshot.ids)[self.rows]
+        self.popularity = np.asarray(snapshot.popularity)[self.rows]
+        genre_masks = np.asarray(snapshot.genre_masks)[self.rows]
+        self.genre_bits = {
+            name: np.packbits(genre_masks >> np.uint64(bit) & np.uint64(1) == 1)
+            for bit, name in enumerate(snapshot.genres)
+        }
+        ages = snapshot.certification_ages[np.asarray(snapshot.certification_codes)[self.rows]]
+        self.certification_bits = {
+            name: np.packbits(ages <= age) for name, age in snapshot.certifications.items()
+        }
+        self.none_bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def filter_bits(self, genres: list[str] = None, maximum_certification: str = None) -> np.ndarray | None:
+        """
+        Get the packed bitset of the positions matching the listing filters.
+
+        Args:
+            genres (list[str], optional): Genres every movie must have; unknown genres match nothing.
+            maximum_certification (str, optional): Highest certification allowed; unknown ones match nothing.
+
+        Returns:
+            np.ndarray | None: The bitset, or None when no filter applies.
+        """
+        bitsets = [self.genre_bits.get(genre, self.none_bits) for genre in dict.fromkeys(genres or [])]
+        if maximum_certification:
+            bitsets.append(self.certification_bits.get(maximum_certification, self.none_bits))
+        if not bitsets:
+            return None
+        bits = bitsets[0].copy()
+        for bitset in bitsets[1:]:
+            np.bitwise_and(bits, bitset, out=bits)
+        return bits
+
+    def page(self, offset: int, limit: int, genres: list[str] = None,
+             maximum_certification: str = None) -> tuple[int, list[MovieRecord]]:
+        """
+        Get a page of the most popular movies matching the listing filters.
+
+        Args:
+            offset (int): Number of matching movies to skip.
+            limit (int): Maximum number of movies.
+            genres (list[str], optional): Genres every movie must have.
+            maximum_certification (str, optional): Highest certification allowed.
+
+        Returns:
+            tuple[int, list[MovieRecord]]: The total number of matching movies and the page.
+        """
+        bits = self.filter_bits(genres, maximum_certification)
+        if bits is None:
+            total = self.size
+            positions = range(offset, min(offset + limit, total))
+        else:
+            total = int(np.bitwise_count(bits).sum())
+            positions = np.flatnonzero(np.unpackbits(bits, count=self.size))[offset:offset + limit].tolist()
+        return total, [MovieRecord(self, position) for position in positions]
@@ -0,0 +1,98 @@
+import json
+import struct
+import numpy as np
+from catalog.snapshot import StringColumn
+
+EXPORT_COLUMNS = (
+    ("id", "int64"),
+    ("title", "string"),
+    ("overview", "string"),
+    ("release_date", "string"),
+    ("popularity", "float64"),
+    ("vote_average", "float32"),
+    ("vote_count", "int32"),
+    ("poster_path", "string"),
+    ("backdrop_path", "string"),
+    ("certification", "string"),
+    ("genres", "string"),
+)
+# Genre names are joined with this separator in the columnar format
+GENRE_SEPARATOR = "|"
+COLUMNAR_MAGIC = b"MOVIESCOL1\n"
+_FRAME_LENGTH = struct.Struct("<I")
+
+
+def encode_ndjson(movies: list[dict]) -> bytes:
+    """
+    Encode a batch of exported movies as newline-delimited JSON, one movie per line.
+    """
+    return "".join(json.dumps(movie, ensure_ascii=False) + "\n" for movie in movies).encode("utf-8")
+
+
+def encode_columnar(movies: list[dict]) -> bytes:
+    """
+    Encode a batch of exported movies as one frame of the columnar format.
+
+    The stream starts with COLUMNAR_MAGIC and is a sequence of frames, each a little-endian
+    uint32 header length, a JSON header and the column buffers it describes; a zero header
+    length ends the stream. Numeric columns are raw little-endian arrays. String columns are
+    stored as in catalog snapshots: int64 offsets, a boolean null mask and a UTF-8 blob.
+
+    Args:
+        movies (list[dict]): Movies as yielded by `MoviesRepositoryLocal.export_movies`.
+
+    Returns:
+        bytes: The frame.
+    """
+    columns, buffers = [], []
+    for name, kind in EXPORT_COLUMNS:
+        values = [movie[name] for movie in movies]
+        if kind == "string":
+            if name == "genres":
+                values = [GENRE_SEPARATOR.join(genres) for genres in values]
+            blob, offsets, nulls = StringColumn.encode(values)
+            parts = [offsets.astype("<i8").tobytes(), nulls.tobytes(), blob]
+        else:
+            array = np.array([0 if value is None else value for value in values], dtype=np.dtype(kind).newbyteorder("<"))
+            parts = [array.tobytes()]
+        columns.append({"name": name, "type": kind, "lengths": [len(part) for part in parts]})
+        buffers.extend(parts)
+    header = json.dumps({"rows": len(movies), "columns": columns}).encode("utf-8")
+    return _FRAME_LENGTH.pack(len(header)) + header + b"".join(buffers)
+
+
+def columnar_end() -> bytes:
+    return _FRAME_LENGTH.pack(0)
+
+
+def read_columnar(stream):
+    """
+    Read a columnar export, one batch at a time.
+
+    Args:
+        stream: Binary file-like object positioned at the start of the export.
+
+    Yields:
+        dict: Column name to NumPy array (numeric columns) or StringColumn (string columns).
+    """
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a movies columnar export")
+    while True:
+        prefix = stream.read(_FRAME_LENGTH.size)
+        if len(prefix) < _FRAME_LENGTH.size:
+            raise ValueError("Truncated movies columnar export")
+        (length,) = _FRAME_LENGTH.unpack(prefix)
+        if length == 0:
+            return
+        header = json.loads(stream.read(length))
+        batch = {}
+        for column in header["columns"]:
+            parts = [stream.read(size) for size in column["lengths"]]
+            if column["type"] == "string":
+                offsets, nulls, blob = parts
+                batch[column["name"]] = StringColumn(
+                    np.frombuffer(blob, dtype=np.uint8), np.frombuffer(offsets, dtype="<i8"), np.frombuffer(nulls, dtype=np.bool_)
+                )
+            else:
+                batch[column["name"]] = np.frombuffer(parts[0], dtype=np.dtype(column["type"]).newbyteorder("<"))
+        yield batch
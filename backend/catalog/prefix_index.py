@@ -0,0 +1,91 @@
+from bisect import bisect_left
+import numpy as np
+from catalog.snapshot import CatalogSnapshot
+from catalog.text_index import tokenize
+
+# Prefixes up to this length match a large share of the catalog; their rows in popularity order
+# are cached, and longer prefixes filter the cached rows of their first characters
+SHORT_PREFIX_LENGTH = 2
+
+
+def normalize_prefix(text: str) -> str:
+    """
+    Accent-fold a title or typed prefix and collapse it to single-space separated tokens.
+    """
+    return " ".join(tokenize(text))
+
+
+class PrefixIndex:
+    """
+    Accent-folded prefix index over movie titles, ranked by popularity.
+
+    Every title is indexed from the start of each of its words ("el señor de los anillos"
+    is also found by "anillos"), as a sorted array of keys searched with binary search.
+    Rows are ranked once, when the index is built: matches are only ever filtered out of
+    lists already in popularity order, so no keystroke sorts them again.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        entries = []
+        titles = snapshot.columns["title"]
+        for row in range(len(snapshot)):
+            title = normalize_prefix(titles[row] or "")
+            start = 0
+            while title:
+                entries.append((title[start:], row))
+                start = title.find(" ", start) + 1
+                if start == 0:
+                    break
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.rows = np.array([row for _, row in entries], dtype=np.int32)
+        # Every row, most popular first
+        self.by_popularity = np.argsort(-np.asarray(snapshot.popularity), kind="stable").astype(np.int32)
+        self.short_prefixes: dict[str, np.ndarray] = {}
+
+    def _matching(self, prefix: str) -> np.ndarray:
+        """
+        Get a boolean mask of the rows whose title has a word starting with `prefix`.
+        """
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\uffff", lo=start)
+        matching = np.zeros(len(self.by_popularity), dtype=bool)
+        matching[self.rows[start:end]] = True
+        return matching
+
+    def _ranked_rows(self, prefix: str) -> np.ndarray:
+        """
+        Get the distinct rows whose title has a word starting with `prefix`, most popular first.
+
+        The rows of a longer prefix are a subset of those of its first SHORT_PREFIX_LENGTH
+        characters, so they are taken from that cached list in order, in time linear in the
+        matches instead of sorting them.
+        """
+        short = prefix[:SHORT_PREFIX_LENGTH]
+        ranked = self.short_prefixes.get(short)
+        if ranked is None:
+            ranked = self.by_popularity[self._matching(short)[self.by_popularity]]
+            self.short_prefixes[short] = ranked
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            return ranked
+        return ranked[self._matching(prefix)[ranked]]
+
+    def complete(self, prefix: str, mask: np.ndarray = None, limit: int = 10) -> list[int]:
+        """
+        Get the most popular rows whose title has a word starting with `prefix`.
+
+        Args:
+            prefix (str): Text typed so far.
+            mask (np.ndarray, optional): Boolean mask of the rows allowed by the filters.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list[int]: Rows, most popular first.
+        """
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return []
+        rows = self._ranked_rows(prefix)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        return rows[:limit].tolist()
@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import threading
+import time
+from sqlalchemy.orm import Session, joinedload, selectinload
+from catalog.snapshot import CatalogSnapshot, open_default_snapshot, write_snapshot, DEFAULT_SNAPSHOT_PATH, SNAPSHOT_NEIGHBOURS
+from db.db import SessionLocal
+from db.movies import Movie as MovieModel
+from db.versions import bump_catalog_version, latest_catalog_version, listen_for_catalog_versions
+
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "60"))
+# Version of a database catalog loaded before any version was published
+UNVERSIONED = "unversioned"
+
+logger = logging.getLogger(__name__)
+
+
+def catalog_version() -> str:
+    """
+    Get the version of the catalog source without loading it.
+
+    The snapshot records its version in `meta.json`; for the database it is the last version
+    published with `bump_catalog_version`. Changes to the movies are only picked up through a
+    published version: no cheap fingerprint of the table notices edits to titles, overviews,
+    genres or certifications, so anything editing the catalog must publish one.
+
+    Returns:
+        str: The current catalog version, or UNVERSIONED if none was published.
+    """
+    meta_path = os.path.join(os.getenv("CATALOG_SNAPSHOT", DEFAULT_SNAPSHOT_PATH), "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)["version"]
+    session = SessionLocal()
+    try:
+        version = latest_catalog_version(session)
+    finally:
+        session.close()
+    return version if version is not None else UNVERSIONED
+
+
+def load_movies_from_db(with_embeddings: bool = False) -> list[dict]:
+    """
+    Load every movie from the database in the `movies_data.json` shape.
+
+    Args:
+        with_embeddings (bool): Whether to parse the stored embeddings too.
+
+    Returns:
+        list[dict]: The movies as stored in PostgreSQL.
+    """
+    session = SessionLocal()
+    try:
+        models = (
+            session.query(MovieModel)
+            .options(joinedload(MovieModel.certification), selectinload(MovieModel.genres))
+            .all()
+        )
+        movies = [
+            {
+                "id": model.id,
+                "title": model.title,
+                "overview": model.overview,
+                "release_date": model.release_date.isoformat() if model.release_date else None,
+                "poster_path": model.poster_path,
+                "backdrop_path": model.backdrop_path,
+                "popularity": model.popularity,
+                "vote_average": model.vote_average,
+                "vote_count": model.vote_count,
+                "certification": model.certification.certification if model.certification else None,
+                "genres": [genre.name for genre in model.genres],
+                **({"embeddings": json.loads(model.embeddings) if model.embeddings else None} if with_embeddings else {}),
+            }
+            for model in models
+        ]
+    finally:
+        session.close()
+    return movies
+
+
+def load_catalog_from_db(version: str = None) -> CatalogSnapshot:
+    """
+    Build an in-memory catalog snapshot (without embeddings) from the database.
+
+    Args:
+        version (str, optional): Catalog version to record.
+
+    Returns:
+        CatalogSnapshot: The catalog as stored in PostgreSQL.
+    """
+    return CatalogSnapshot.from_movies(load_movies_from_db(), version=version)
+
+
+def publish_catalog(session: Session, source: str) -> str:
+    """
+    Publish a new catalog version after the movies changed in the database.
+
+    A snapshot on disk takes precedence over the database, so if there is one it is first
+    rewritten from the database with the new version; otherwise it would keep serving the
+    previous catalog. API processes are notified once the snapshot is in place.
+
+    Args:
+        session (Session): Database session.
+        source (str): What changed the catalog, e.g. the ingestion script.
+
+    Returns:
+        str: The published version.
+    """
+    version = str(time.time_ns())
+    path = os.getenv("CATALOG_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        snapshot = write_snapshot(load_movies_from_db(with_embeddings=True), path, version, neighbours=SNAPSHOT_NEIGHBOURS)
+        logger.info("snapshot %s rewritten from the database with %d movies", path, len(snapshot))
+    return bump_catalog_version(session, source, version)
+
+
+def load_catalog() -> CatalogSnapshot:
+    """
+    Load the catalog from the configured snapshot, or from the database if there is none.
+    """
+    snapshot = open_default_snapshot()
+    return snapshot if snapshot is not None else load_catalog_from_db(catalog_version())
+
+
+class CatalogRegistry:
+    """
+    Holds the catalog loaded in this process and the in-memory indexes derived from it.
+
+    Indexes are registered by name with the function that builds them. When the catalog
+    version changes, the new catalog and all its indexes are built before being swapped in,
+    so requests keep using the previous ones in the meantime. Subscribers (e.g. response
+    caches) are called after every change.
+    """
+
+    def __init__(self, loader=load_catalog, version_reader=catalog_version):
+        self.loader = loader
+        self.version_reader = version_reader
+        self.snapshot: CatalogSnapshot | None = None
+        self.builders: dict = {}
+        self.indexes: dict = {}
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.subscribers: list = []
+        self.refresh_thread = None
+        self.listener_thread = None
+        self.stop_event = threading.Event()
+
+    def subscribe(self, callback):
+        """
+        Register a function called with the catalog version every time the catalog changes.
+        """
+        self.subscribers.append(callback)
+
+    def _notify(self, version: str):
+        for callback in self.subscribers:
+            try:
+                callback(version)
+            except Exception as e:
+                logger.exception("catalog subscriber failed: %s", e)
+
+    def load(self) -> CatalogSnapshot:
+        """
+        (Re)load the catalog and rebuild every registered index from it.
+        """
+        snapshot = self.loader()
+        indexes = {name: (snapshot, builder(snapshot)) for name, builder in list(self.builders.items())}
+        with self.lock:
+            previous, self.snapshot = self.snapshot, snapshot
+            self.indexes = indexes
+        if previous is not None:
+            self._notify(snapshot.version)
+        return snapshot
+
+    def get(self) -> CatalogSnapshot:
+        if self.snapshot is None:
+            return self.load()
+        return self.snapshot
+
+    def get_with_index(self, name: str, builder) -> tuple[CatalogSnapshot, object]:
+        """
+        Get the current catalog together with one of its indexes, building it on first use.
+
+        Both come from the same catalog version even if a reload happens meanwhile, so the
+        rows of the index can be resolved against the returned catalog.
+
+        Args:
+            name (str): Name of the index.
+            builder (callable): Function building the index from a CatalogSnapshot.
+
+        Returns:
+            tuple[CatalogSnapshot, object]: The catalog and the index built from it.
+        """
+        self.builders.setdefault(name, builder)
+        snapshot = self.get()
+        index = self.indexes.get(name)
+        if index is None or index[0] is not snapshot:
+            index = (snapshot, builder(snapshot))
+            with self.lock:
+                if self.snapshot is snapshot:
+                    self.indexes[name] = index
+        return index
+
+    def get_index(self, name: str, builder):
+        return self.get_with_index(name, builder)[1]
+
+    def refresh(self) -> bool:
+        """
+        Reload the catalog if its version changed.
+
+        Returns:
+            bool: Whether a new catalog was loaded.
+        """
+        with self.refresh_lock:
+            if self.snapshot is not None and self.version_reader() == self.snapshot.version:
+                return False
+            self.load()
+            return True
+
+    def handle_published_version(self, version: str):
+        """
+        React to a catalog version published by an ingestion run: reload the catalog if its
+        version changed, and tell subscribers anyway, since the database or the vectors
+        behind derived data may have changed even when the snapshot did not.
+        """
+        if not self.refresh():
+            self._notify(version)
+
+    def start_change_listener(self, reconnect_delay: float = 5.0):
+        """
+        Listen for published catalog versions in a background thread (PostgreSQL only).
+        """
+        if self.listener_thread is not None:
+            return
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    if not listen_for_catalog_versions(self.handle_published_version, self.stop_event):
+                        return
+                except Exception as e:
+                    logger.warning("catalog listener failed, reconnecting: %s", e)
+                    self.stop_event.wait(reconnect_delay)
+
+        self.listener_thread = threading.Thread(target=run, name="catalog-listener", daemon=True)
+        self.listener_thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def start_auto_refresh(self, interval: float = CATALOG_REFRESH_INTERVAL):
+        """
+        Check the catalog version every `interval` seconds in a background thread.
+        """
+        if self.refresh_thread is not None or interval <= 0:
+            return
+
+        def run():
+            while not self.stop_event.wait(interval):
+                try:
+                    if self.refresh():
+                        logger.info("catalog reloaded version=%s", self.snapshot.version)
+                except Exception as e:
+                    logger.warning("catalog refresh failed: %s", e)
+
+        self.refresh_thread = threading.Thread(target=run, name="catalog-refresh", daemon=True)
+        self.refresh_thread.start()
+
+
+catalog_registry = CatalogRegistry()
@@ -0,0 +1,516 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_PATH = "movies_snapshot"
+# Nearest neighbours precomputed per movie for recommendations (exact, quadratic in the catalog size); 0 skips them
+SNAPSHOT_NEIGHBOURS = int(os.getenv("CATALOG_NEIGHBOURS", "30"))
+
+# Rows without a certification (or with one outside the vocabulary) use this code
+NO_CERTIFICATION = 255
+STRING_COLUMNS = ("title", "overview", "release_date", "poster_path", "backdrop_path")
+
+VALID_CERTIFICATIONS = {
+    "G": 0, "PG": 10, "PG-13": 13, "R": 17, "NC-17": 18,
+    "TV-G": 0, "TV-PG": 10, "TV-14": 14, "TV-MA": 18,
+}
+
+
+class StringColumn:
+    """
+    Read-only column of nullable UTF-8 strings stored as one byte blob plus an offsets array.
+    """
+
+    def __init__(self, blob, offsets: np.ndarray, nulls: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str | None:
+        if self.nulls[row]:
+            return None
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    @staticmethod
+    def encode(values: list) -> tuple[bytes, np.ndarray, np.ndarray]:
+        """
+        Encode a list of strings (or None) into the blob, offsets and null mask arrays.
+
+        Args:
+            values (list): Strings to encode, None for missing values.
+
+        Returns:
+            tuple: The UTF-8 blob, the int64 offsets (len + 1) and the boolean null mask.
+        """
+        encoded = [(value or "").encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        nulls = np.array([value is None for value in values], dtype=np.bool_)
+        return b"".join(encoded), offsets, nulls
+
+
+class CatalogSnapshot:
+    """
+    Columnar, memory-mappable view of the movie catalog.
+
+    A snapshot is a directory holding a float32 embedding matrix, an ID-to-row index,
+    one file per metadata column and, optionally, the precomputed nearest neighbours of
+    every movie. Opening it only reads `meta.json`; every array is memory-mapped, so all
+    processes that open the same snapshot share the page cache.
+    """
+
+    def __init__(self, meta: dict, arrays: dict, strings: dict, path: str | None = None):
+        self.meta = meta
+        self.path = path
+        self.version = meta["version"]
+        self.genres = meta["genres"]
+        self.certifications = meta["certifications"]
+        self.certification_names = list(self.certifications)
+        self.ids = arrays["ids"]
+        self.embeddings = arrays["embeddings"]
+        self.popularity = arrays["popularity"]
+        self.vote_average = arrays["vote_average"]
+        self.vote_count = arrays["vote_count"]
+        self.certification_codes = arrays["certification"]
+        self.genre_masks = arrays["genres"]
+        self.sorted_ids = arrays["sorted_ids"]
+        self.sorted_rows = arrays["sorted_rows"]
+        # (rows, k) neighbour rows and cosine scores, best first; None if they were not precomputed
+        self.neighbour_rows = arrays.get("neighbours")
+        self.neighbour_scores = arrays.get("neighbour_scores")
+        self.columns = strings
+        # Minimum age of every certification code; rows without certification never pass a ceiling
+        self.certification_ages = np.full(256, np.iinfo(np.int16).max, dtype=np.int16)
+        for code, name in enumerate(self.certification_names):
+            self.certification_ages[code] = self.certifications[name]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.meta["dimension"]
+
+    @staticmethod
+    def open(path: str = DEFAULT_SNAPSHOT_PATH) -> "CatalogSnapshot":
+        """
+        Open a snapshot directory, memory-mapping every array.
+
+        The link written by `write_snapshot` is resolved once, so every file comes from the
+        same version even if a new one is published while opening.
+
+        Args:
+            path (str): Directory (or link to it) written by `write_snapshot`.
+
+        Returns:
+            CatalogSnapshot: A read-only snapshot backed by the files in `path`.
+        """
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format {meta.get('format')} in {path}")
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        arrays = {name: load(name) for name in (
+            "ids", "embeddings", "popularity", "vote_average", "vote_count",
+            "certification", "genres", "sorted_ids", "sorted_rows",
+        )}
+        if meta.get("neighbours"):
+            arrays["neighbours"] = load("neighbours")
+            arrays["neighbour_scores"] = load("neighbour_scores")
+        strings = {}
+        for name in meta["string_columns"]:
+            blob_path = os.path.join(path, f"{name}.bin")
+            # Empty files cannot be memory-mapped
+            blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else b""
+            strings[name] = StringColumn(blob, load(f"{name}.offsets"), load(f"{name}.nulls"))
+        return CatalogSnapshot(meta, arrays, strings, path=path)
+
+    @staticmethod
+    def from_movies(movies: list[dict], version: str | None = None, neighbours: int = 0) -> "CatalogSnapshot":
+        """
+        Build an in-memory snapshot from movie dictionaries (the `movies_data.json` shape).
+
+        Args:
+            movies (list[dict]): Movies with id, title, genres, certification, popularity and embeddings.
+            version (str, optional): Catalog version to record. Defaults to a timestamp.
+            neighbours (int): Number of nearest neighbours to precompute per movie; 0 skips them.
+
+        Returns:
+            CatalogSnapshot: A snapshot holding the same columns `open` would map from disk.
+        """
+        meta, arrays, encoded = _build_columns(movies, version, neighbours)
+        strings = {
+            name: StringColumn(np.frombuffer(blob, dtype=np.uint8), offsets, nulls)
+            for name, (blob, offsets, nulls) in encoded.items()
+        }
+        return CatalogSnapshot(meta, arrays, strings)
+
+    def row_of(self, movie_id: int) -> int | None:
+        """
+        Find the row of a movie through the sorted ID index.
+
+        Args:
+            movie_id (int): The ID of the movie.
+
+        Returns:
+            int | None: The row of the movie, or None if it is not in the snapshot.
+        """
+        position = int(np.searchsorted(self.sorted_ids, movie_id))
+        if position < len(self.sorted_ids) and self.sorted_ids[position] == movie_id:
+            return int(self.sorted_rows[position])
+        return None
+
+    def embedding(self, movie_id: int) -> np.ndarray | None:
+        """
+        Get the embedding row of a movie without copying it out of the mapped matrix.
+
+        Args:
+            movie_id (int): The ID of the movie.
+
+        Returns:
+            np.ndarray | None: The float32 embedding, or None if the movie is not in the snapshot.
+        """
+        row = self.row_of(movie_id)
+        return self.embeddings[row] if row is not None else None
+
+    def neighbours(self, movie_id: int, limit: int) -> list[tuple[int, float]] | None:
+        """
+        Get the precomputed nearest neighbours of a movie.
+
+        Args:
+            movie_id (int): The ID of the movie.
+            limit (int): The maximum number of neighbours.
+
+        Returns:
+            list[tuple[int, float]] | None: (movie ID, cosine score) pairs, best first, or None if
+            the snapshot has no neighbours or the movie is not in it.
+        """
+        if self.neighbour_rows is None:
+            return None
+        row = self.row_of(movie_id)
+        if row is None:
+            return None
+        rows = self.neighbour_rows[row, :limit]
+        scores = self.neighbour_scores[row, :limit]
+        return [(int(self.ids[r]), float(score)) for r, score in zip(rows, scores) if r >= 0]
+
+    def search(self, embedding, limit: int, mask: np.ndarray = None) -> list[tuple[int, float]] | None:
+        """
+        Exact cosine search over the mapped embedding matrix, an in-process stand-in for Qdrant.
+
+        Args:
+            embedding: The query vector.
+            limit (int): The maximum number of results.
+            mask (np.ndarray, optional): Boolean mask of the rows that may be returned, e.g. from `filter_mask`.
+
+        Returns:
+            list[tuple[int, float]] | None: (movie ID, score) pairs, best first, or None if the
+            snapshot has no embeddings.
+        """
+        if self.dimension == 0 or len(self) == 0:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.embeddings @ query
+        scores /= np.maximum(np.linalg.norm(self.embeddings, axis=1), 1e-12)
+        if mask is not None:
+            scores[~mask] = -np.inf
+            limit = min(limit, int(mask.sum()))
+        limit = min(limit, len(scores))
+        if limit == 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.ids[row]), float(scores[row])) for row in top]
+
+    def certification(self, row: int) -> str | None:
+        code = int(self.certification_codes[row])
+        return self.certification_names[code] if code != NO_CERTIFICATION else None
+
+    def genre_names(self, row: int) -> list[str]:
+        mask = int(self.genre_masks[row])
+        return [name for bit, name in enumerate(self.genres) if mask >> bit & 1]
+
+    def filter_mask(self, genres: list[str] = None, maximum_certification: str = None) -> np.ndarray:
+        """
+        Get the rows matching the listing filters: every genre (AND) and a certification ceiling.
+
+        As in the database queries, an unknown certification matches no movie.
+
+        Args:
+            genres (list[str], optional): Genres every movie must have.
+            maximum_certification (str, optional): Highest certification allowed.
+
+        Returns:
+            np.ndarray: Boolean mask over the rows.
+        """
+        mask = np.ones(len(self), dtype=np.bool_)
+        if genres:
+            if any(genre not in self.genres for genre in genres):
+                return np.zeros(len(self), dtype=np.bool_)
+            required = np.uint64(sum(1 << self.genres.index(genre) for genre in set(genres)))
+            mask &= (self.genre_masks & required) == required
+        if maximum_certification:
+            maximum_age = self.certifications.get(maximum_certification)
+            if maximum_age is None:
+                return np.zeros(len(self), dtype=np.bool_)
+            mask &= self.certification_ages[self.certification_codes] <= maximum_age
+        return mask
+
+    def movie(self, row: int, with_embeddings: bool = True) -> dict:
+        """
+        Rebuild the movie dictionary stored at a row.
+
+        Args:
+            row (int): Row in the snapshot.
+            with_embeddings (bool): Whether to include the embedding, as a row of the memory-mapped
+                matrix (no copy is made until it is read).
+
+        Returns:
+            dict: The movie in the `movies_data.json` shape.
+        """
+        movie = {
+            "id": int(self.ids[row]),
+            "genres": self.genre_names(row),
+            "certification": self.certification(row),
+            "popularity": float(self.popularity[row]),
+            "vote_average": float(self.vote_average[row]),
+            "vote_count": int(self.vote_count[row]),
+        }
+        for name, column in self.columns.items():
+            movie[name] = column[row]
+        if with_embeddings:
+            movie["embeddings"] = self.embeddings[row]
+        return movie
+
+    def iter_movies(self, with_embeddings: bool = True):
+        for row in range(len(self)):
+            yield self.movie(row, with_embeddings)
+
+
+def nearest_neighbours(embeddings: np.ndarray, k: int, block_size: int = 1024) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine nearest neighbours of every row, excluding the row itself, by blocked matrix products.
+
+    Args:
+        embeddings (np.ndarray): The (rows, dimension) embedding matrix.
+        k (int): Number of neighbours per row.
+        block_size (int): Rows per matrix product, to bound memory.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (rows, k) int32 neighbour rows and float32 scores, best first.
+        Rows with fewer than `k` other rows are padded with -1.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    count = len(matrix)
+    found = min(k, max(count - 1, 0))
+    rows = np.full((count, k), -1, dtype=np.int32)
+    scores = np.zeros((count, k), dtype=np.float32)
+    if found == 0:
+        return rows, scores
+    for start in range(0, count, block_size):
+        block = matrix[start:start + block_size] @ matrix.T
+        block[np.arange(len(block)), np.arange(start, start + len(block))] = -np.inf
+        top = np.argpartition(-block, found - 1, axis=1)[:, :found]
+        order = np.argsort(-np.take_along_axis(block, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        rows[start:start + len(block), :found] = top
+        scores[start:start + len(block), :found] = np.take_along_axis(block, top, axis=1)
+    return rows, scores
+
+
+def _build_columns(movies: list[dict], version: str | None, neighbours: int = 0):
+    # Keep the first occurrence of each ID, as the upload scripts do
+    unique, seen = [], set()
+    for movie in movies:
+        if movie["id"] in seen:
+            continue
+        seen.add(movie["id"])
+        unique.append(movie)
+
+    # Embeddings may be lists or NumPy rows
+    dimension = len(unique[0]["embeddings"]) if unique and unique[0].get("embeddings") is not None else 0
+    genres = sorted({genre for movie in unique for genre in movie.get("genres", [])})
+    if len(genres) > 64:
+        raise ValueError(f"Snapshots support up to 64 genres, got {len(genres)}")
+    genre_bits = {genre: bit for bit, genre in enumerate(genres)}
+
+    certifications = dict(VALID_CERTIFICATIONS)
+    certification_codes = {name: code for code, name in enumerate(certifications)}
+
+    ids = np.array([movie["id"] for movie in unique], dtype=np.int64)
+    embeddings = np.zeros((len(unique), dimension), dtype=np.float32)
+    for row, movie in enumerate(unique):
+        if movie.get("embeddings") is not None and len(movie["embeddings"]):
+            embeddings[row] = movie["embeddings"]
+    masks = np.zeros(len(unique), dtype=np.uint64)
+    for row, movie in enumerate(unique):
+        for genre in movie.get("genres", []):
+            masks[row] |= np.uint64(1 << genre_bits[genre])
+
+    sorted_rows = np.argsort(ids, kind="stable").astype(np.int32)
+    arrays = {
+        "ids": ids,
+        "embeddings": embeddings,
+        "popularity": np.array([movie.get("popularity") or 0.0 for movie in unique], dtype=np.float64),
+        "vote_average": np.array([movie.get("vote_average") or 0.0 for movie in unique], dtype=np.float32),
+        "vote_count": np.array([movie.get("vote_count") or 0 for movie in unique], dtype=np.int32),
+        "certification": np.array(
+            [certification_codes.get(movie.get("certification"), NO_CERTIFICATION) for movie in unique],
+            dtype=np.uint8,
+        ),
+        "genres": masks,
+        "sorted_ids": ids[sorted_rows],
+        "sorted_rows": sorted_rows,
+    }
+    if neighbours > 0 and dimension > 0:
+        arrays["neighbours"], arrays["neighbour_scores"] = nearest_neighbours(embeddings, neighbours)
+    else:
+        neighbours = 0
+    encoded = {name: StringColumn.encode([movie.get(name) for movie in unique]) for name in STRING_COLUMNS}
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version or str(time.time_ns()),
+        "count": len(unique),
+        "dimension": dimension,
+        "genres": genres,
+        "certifications": certifications,
+        "string_columns": list(STRING_COLUMNS),
+        "neighbours": neighbours,
+    }
+    return meta, arrays, encoded
+
+
+def _publish_snapshot_dir(version_path: str, path: str):
+    """
+    Point the `path` link at a snapshot directory written next to it, atomically, and delete
+    the versions older than the one it replaces.
+
+    The replaced version is kept, since a reader that resolved the link just before the swap
+    may still be opening its files; open snapshots keep working after their files are deleted.
+    """
+    parent = os.path.dirname(version_path)
+    previous = os.path.realpath(path) if os.path.islink(path) else None
+    if os.path.isdir(path) and not os.path.islink(path):
+        # Snapshot written as a plain directory by an older version: a directory cannot be
+        # atomically replaced by a link, so readers miss this one swap
+        legacy_path = os.path.join(parent, f".{os.path.basename(path)}-legacy-{time.time_ns()}")
+        os.replace(path, legacy_path)
+        previous = legacy_path
+    link_path = f"{version_path}.link"
+    os.symlink(os.path.basename(version_path), link_path)
+    os.replace(link_path, path)
+
+    prefix = f".{os.path.basename(path)}-"
+    for name in os.listdir(parent):
+        old_path = os.path.join(parent, name)
+        if (name.startswith(prefix) and os.path.isdir(old_path) and not os.path.islink(old_path)
+                and old_path not in (version_path, previous)
+                and os.path.exists(os.path.join(old_path, "meta.json"))):
+            shutil.rmtree(old_path, ignore_errors=True)
+
+
+def write_snapshot(movies: list[dict], path: str = DEFAULT_SNAPSHOT_PATH, version: str | None = None,
+                   neighbours: int = 0) -> CatalogSnapshot:
+    """
+    Write a catalog snapshot and return it opened from disk.
+
+    Every version is written to its own directory next to `path` (`.<name>-<suffix>`), and
+    `path` is a symbolic link repointed to it with an atomic rename, so readers always find
+    a complete snapshot at `path`: the previous one until the swap, the new one afterwards.
+
+    Args:
+        movies (list[dict]): Movies in the `movies_data.json` shape.
+        path (str): Path of the link to the current snapshot directory.
+        version (str, optional): Catalog version to record. Defaults to a timestamp.
+        neighbours (int): Number of nearest neighbours to precompute per movie; 0 skips them.
+
+    Returns:
+        CatalogSnapshot: The written snapshot, memory-mapped.
+    """
+    meta, arrays, encoded = _build_columns(movies, version, neighbours)
+    path = os.path.abspath(path)
+    version_path = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}-", dir=os.path.dirname(path))
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(version_path, f"{name}.npy"), np.ascontiguousarray(array))
+        for name, (blob, offsets, nulls) in encoded.items():
+            with open(os.path.join(version_path, f"{name}.bin"), "wb") as f:
+                f.write(blob)
+            np.save(os.path.join(version_path, f"{name}.offsets.npy"), offsets)
+            np.save(os.path.join(version_path, f"{name}.nulls.npy"), nulls)
+        # Written last: a directory without it is still being written and is never pruned
+        with open(os.path.join(version_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        _publish_snapshot_dir(version_path, path)
+    except Exception:
+        shutil.rmtree(version_path, ignore_errors=True)
+        raise
+    return CatalogSnapshot.open(path)
+
+
+def open_default_snapshot() -> CatalogSnapshot | None:
+    """
+    Open the snapshot configured through `CATALOG_SNAPSHOT`, if it exists.
+
+    Returns:
+        CatalogSnapshot | None: The snapshot, or None if there is no snapshot on disk.
+    """
+    path = os.getenv("CATALOG_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    return CatalogSnapshot.open(path)
+
+
+def snapshot_for(input_file: str) -> CatalogSnapshot | None:
+    """
+    Open the configured snapshot in place of `input_file`, if it was written after that file
+    (or the file does not exist), so a stale snapshot never shadows a newer JSON export.
+
+    Args:
+        input_file (str): Path of the `movies_data.json` file the caller would read.
+
+    Returns:
+        CatalogSnapshot | None: The snapshot, or None to read `input_file`.
+    """
+    snapshot = open_default_snapshot()
+    if snapshot is None or not os.path.exists(input_file):
+        return snapshot
+    if os.path.getmtime(os.path.join(snapshot.path, "meta.json")) < os.path.getmtime(input_file):
+        print(f"[WARN] El snapshot {snapshot.path} es anterior a {input_file}; se usa {input_file}.")
+        return None
+    return snapshot
+
+
+def load_movies(input_file: str, with_embeddings: bool = True) -> list[dict]:
+    """
+    Load the catalog from the configured snapshot, if it is not older than the JSON file,
+    falling back to parsing the JSON file.
+
+    Args:
+        input_file (str): Path of the `movies_data.json` file.
+        with_embeddings (bool): Whether the movies need their embeddings.
+
+    Returns:
+        list[dict]: Movies in the `movies_data.json` shape. Embeddings read from the snapshot
+        are NumPy rows of the memory-mapped matrix rather than lists.
+    """
+    snapshot = snapshot_for(input_file)
+    if snapshot is not None:
+        return list(snapshot.iter_movies(with_embeddings))
+    with open(input_file, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,106 @@
+import re
+import unicodedata
+import numpy as np
+from catalog.snapshot import CatalogSnapshot
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters and the weight of a title occurrence relative to an overview occurrence
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 3.0
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase a text and strip its accents ("Acción" -> "accion").
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_PATTERN.findall(fold(text)) if text else []
+
+
+class InvertedIndex:
+    """
+    BM25 inverted index over movie titles and overviews.
+
+    Posting lists are stored CSR-style: for term `t`, `docs[offsets[t]:offsets[t + 1]]` holds
+    the rows containing it and `weights` the matching weighted term frequencies. A query only
+    touches the postings of its terms, accumulated with vectorized NumPy operations.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        postings: dict[str, dict[int, float]] = {}
+        lengths = np.zeros(len(snapshot), dtype=np.float32)
+        titles, overviews = snapshot.columns["title"], snapshot.columns["overview"]
+        for row in range(len(snapshot)):
+            for weight, tokens in ((TITLE_WEIGHT, tokenize(titles[row])), (1.0, tokenize(overviews[row]))):
+                lengths[row] += weight * len(tokens)
+                for token in tokens:
+                    term = postings.setdefault(token, {})
+                    term[row] = term.get(row, 0.0) + weight
+
+        self.terms = {term: index for index, term in enumerate(postings)}
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum([len(rows) for rows in postings.values()], out=self.offsets[1:])
+        self.docs = np.empty(self.offsets[-1], dtype=np.int32)
+        self.weights = np.empty(self.offsets[-1], dtype=np.float32)
+        for index, rows in enumerate(postings.values()):
+            start, end = self.offsets[index], self.offsets[index + 1]
+            self.docs[start:end] = np.fromiter(rows.keys(), dtype=np.int32, count=len(rows))
+            self.weights[start:end] = np.fromiter(rows.values(), dtype=np.float32, count=len(rows))
+
+        self.size = len(snapshot)
+        average_length = float(lengths.mean()) if len(lengths) else 0.0
+        # Per-row BM25 length normalization, precomputed once
+        self.norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(average_length, 1e-9))
+
+    def search(self, query: str, mask: np.ndarray = None, limit: int = 50) -> list[tuple[int, float]]:
+        """
+        Rank rows by BM25 score for a query.
+
+        Args:
+            query (str): Free-text query.
+            mask (np.ndarray, optional): Boolean mask of the rows allowed by the filters.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[tuple[int, float]]: (row, score) pairs, best first.
+        """
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token in set(tokenize(query)):
+            index = self.terms.get(token)
+            if index is None:
+                continue
+            start, end = self.offsets[index], self.offsets[index + 1]
+            docs, tf = self.docs[start:end], self.weights[start:end]
+            idf = np.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + self.norms[docs])
+        if mask is not None:
+            scores[~mask] = 0
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(row), float(scores[row])) for row in candidates]
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = 60) -> list[tuple[int, float]]:
+    """
+    Fuse several rankings of the same items with reciprocal-rank fusion.
+
+    Args:
+        rankings (list[list[int]]): Each ranking lists items best first.
+        k (int): RRF damping constant.
+
+    Returns:
+        list[tuple[int, float]]: (item, fused score) pairs, best first.
+    """
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,76 @@
+import json
+import sqlite3
+import time
+import zlib
+
+
+class ResponseCache:
+    """
+    Persistent cache of decoded JSON responses in a single SQLite file.
+
+    Bodies are stored zlib-compressed and keyed by base URL, path and sorted query parameters.
+    Entries older than `ttl` seconds are treated as missing (a `ttl` of None never expires).
+
+    Writes are committed in batches, every `commit_every` responses or `commit_interval`
+    seconds, and on `close`: the cache is used from the event loop, where a commit (an fsync)
+    per response would stall every other request. A crash loses at most the last batch.
+    """
+
+    def __init__(self, path: str, ttl: float | None = None, commit_every: int = 100, commit_interval: float = 1.0):
+        self.path = path
+        self.ttl = ttl
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.uncommitted = 0
+        self.committed_at = time.monotonic()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, body BLOB NOT NULL)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(path: str, params: dict = None, base_url: str = "") -> str:
+        """
+        Build the cache key of a request. The API key is never part of it.
+
+        Args:
+            path (str): Request path.
+            params (dict, optional): Query parameters.
+            base_url (str): Base URL the path is relative to, so clients of different APIs or
+                API versions sharing a cache file never read each other's responses.
+
+        Returns:
+            str: The cache key.
+        """
+        query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()) if k != "api_key")
+        return f"{base_url.rstrip('/')}/{path.lstrip('/')}?{query}"
+
+    def get(self, key: str) -> dict | None:
+        row = self.connection.execute("SELECT fetched_at, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        fetched_at, body = row
+        if self.ttl is not None and time.time() - fetched_at > self.ttl:
+            return None
+        return json.loads(zlib.decompress(body))
+
+    def set(self, key: str, data: dict):
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses (key, fetched_at, body) VALUES (?, ?, ?)",
+            (key, time.time(), body),
+        )
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every or time.monotonic() - self.committed_at >= self.commit_interval:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.uncommitted = 0
+        self.committed_at = time.monotonic()
+
+    def close(self):
+        self.commit()
+        self.connection.close()
@@ -0,0 +1,185 @@
+import asyncio
+import os
+from clients.cache import ResponseCache
+from clients.rate_limit import AdaptiveRateLimiter
+from clients.tmdb import TMDBClient, TMDBError, CacheMissError, extract_us_certification
+
+CRAWL_INITIAL_RATE = float(os.getenv("CRAWL_INITIAL_RATE", "20"))
+CRAWL_MAX_RATE = float(os.getenv("CRAWL_MAX_RATE", "50"))
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "20"))
+CRAWL_MAX_ROUNDS = int(os.getenv("CRAWL_MAX_ROUNDS", "5"))
+
+# Response cache shared by every crawl; an empty path disables it
+CRAWL_CACHE_PATH = os.getenv("CRAWL_CACHE_PATH", "tmdb_cache.sqlite3")
+CRAWL_CACHE_TTL = float(os.getenv("CRAWL_CACHE_TTL", str(7 * 24 * 3600)))
+CRAWL_REPLAY = os.getenv("CRAWL_REPLAY", "false").lower() == "true"
+
+
+def make_crawl_client() -> TMDBClient:
+    """
+    Create a TMDB client for ingestion crawls. Its rate adapts to throttling and its
+    responses are cached on disk; with CRAWL_REPLAY it serves only from the cache.
+    """
+    cache = ResponseCache(CRAWL_CACHE_PATH, ttl=None if CRAWL_REPLAY else CRAWL_CACHE_TTL) if CRAWL_CACHE_PATH else None
+    if CRAWL_REPLAY and cache is None:
+        raise Exception("CRAWL_REPLAY requires CRAWL_CACHE_PATH")
+    return TMDBClient(
+        rate_limiter=AdaptiveRateLimiter(CRAWL_INITIAL_RATE, CRAWL_MAX_RATE),
+        max_connections=CRAWL_WORKERS,
+        max_concurrency=CRAWL_WORKERS,
+        cache=cache,
+        replay=CRAWL_REPLAY,
+    )
+
+
+async def crawl(client: TMDBClient, items, fetch, label: str, workers: int = CRAWL_WORKERS,
+                max_rounds: int = CRAWL_MAX_ROUNDS) -> tuple[dict, list]:
+    """
+    Fetch every item with a pool of workers, requeueing failed items for later rounds.
+
+    Items that still fail after the client's own retries, or whose fetch raises any other
+    error, go back to the queue of the next round instead of being dropped. A 404 is final and stored as None; a replay-mode cache
+    miss is final and reported as failed.
+
+    Args:
+        client (TMDBClient): The client to fetch with.
+        items (iterable): Items to fetch (pages, movie IDs...).
+        fetch (callable): Coroutine function `fetch(client, item)` returning the item result.
+        label (str): Name of the items for progress messages.
+        workers (int): Number of concurrent workers.
+        max_rounds (int): Number of passes over failed items.
+
+    Returns:
+        tuple[dict, list]: The results by item and the items that failed in every round.
+    """
+    results = {}
+    missing = []
+    pending = list(dict.fromkeys(items))
+    for round_number in range(1, max_rounds + 1):
+        if not pending:
+            break
+        queue = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+        failed = []
+
+        async def worker():
+            while not queue.empty():
+                item = queue.get_nowait()
+                try:
+                    results[item] = await fetch(client, item)
+                except CacheMissError:
+                    missing.append(item)
+                except TMDBError as e:
+                    if e.status_code == 404:
+                        results[item] = None
+                    else:
+                        failed.append(item)
+                except Exception as e:
+                    # Unexpected payloads or transport errors must not abort the whole crawl
+                    print(f"[WARN] Error inesperado con {item} ({label}): {type(e).__name__}: {e}")
+                    failed.append(item)
+
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(pending)))))
+        if failed:
+            print(f"[WARN] {len(failed)} {label} fallaron en la ronda {round_number}, se reintentarán.")
+        pending = failed
+
+    pending = missing + pending
+    report = client.report()
+    print(
+        f"{label.capitalize()}: {len(results)} obtenidos, {report['cache_hits']} desde caché, {report['requests']} peticiones "
+        f"({report['requests_per_second']} req/s, límite actual {report['current_rate_limit']} req/s), "
+        f"{report['retries']} reintentos, {report['throttled']} respuestas 429."
+    )
+    if pending:
+        print(f"[ERROR] {len(pending)} {label} no se pudieron obtener: {pending}")
+    return results, pending
+
+
+async def fetch_movie_genres() -> dict:
+    """
+    Fetch the TMDB movie genres.
+
+    Returns:
+        dict: Genre names by genre ID.
+    """
+    client = make_crawl_client()
+    try:
+        data = await client.get_json("genre/movie/list", {"language": "es"})
+    finally:
+        await client.close()
+    return {genre['id']: genre['name'] for genre in data['genres']}
+
+
+async def fetch_movie_page(client: TMDBClient, page: int) -> list:
+    data = await client.get_json("movie/popular", {"language": "es", "page": page, "include_adult": "false"})
+    return data.get("results", [])
+
+
+async def fetch_movie_pages_in_range(start_page: int, end_page: int) -> list:
+    """
+    Fetch the popular movie pages in a range, in page order.
+
+    Args:
+        start_page (int): First page.
+        end_page (int): Last page, included.
+
+    Returns:
+        list: The raw TMDB movies of every page that could be fetched.
+    """
+    client = make_crawl_client()
+    try:
+        pages, _ = await crawl(client, range(start_page, end_page + 1), fetch_movie_page, "páginas")
+    finally:
+        await client.close()
+    return [movie for page in sorted(pages) for movie in (pages[page] or [])]
+
+
+async def fetch_movie_details(client: TMDBClient, movie_id: int) -> dict:
+    """
+    Fetch the details and release dates of a movie in a single request.
+
+    Args:
+        client (TMDBClient): The client to fetch with.
+        movie_id (int): The ID of the movie.
+
+    Returns:
+        dict: The TMDB movie details, with the US certification under `certification`.
+    """
+    data = await client.get_json(f"movie/{movie_id}", {"append_to_response": "release_dates"})
+    data["certification"] = extract_us_certification(data.pop("release_dates", {}))
+    return data
+
+
+async def get_movie_details_for_movies(movie_list: list) -> dict:
+    """
+    Fetch the details (with certification) of every movie.
+
+    Args:
+        movie_list (list): Movies with an `id`.
+
+    Returns:
+        dict: Details by movie ID, for every movie TMDB returned.
+    """
+    client = make_crawl_client()
+    try:
+        details, _ = await crawl(client, [m["id"] for m in movie_list], fetch_movie_details, "películas")
+    finally:
+        await client.close()
+    return {movie_id: data for movie_id, data in details.items() if data}
+
+
+def get_embedding_text(details: dict) -> str:
+    """
+    Build the text embedded for a movie from its TMDB details.
+
+    Args:
+        details (dict): The details returned by `fetch_movie_details`.
+
+    Returns:
+        str: Title, overview, genres and production companies.
+    """
+    return f"{details.get('title', '')}. {details.get('overview', '')}. " + \
+        ", ".join([g['name'] for g in details.get('genres', [])]) + ". " + \
+        ", ".join([p['name'] for p in details.get('production_companies', [])])
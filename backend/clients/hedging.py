@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+from collections import deque
+from observability.metrics import HEDGES, HEDGE_WINS, VECTOR_TIMEOUTS
+
+# Percentile of recent primary latencies after which the hedged request is sent
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.005"))
+# Delay used until enough latencies were observed
+HEDGE_INITIAL_DELAY = float(os.getenv("HEDGE_INITIAL_DELAY", "0.05"))
+HEDGE_MIN_SAMPLES = 20
+
+
+class LatencyBudget:
+    """
+    Time left to answer a request. Stages run one after the other and each one gets what the
+    previous stages left over, so a slow database stage shortens the vector search timeout.
+    """
+
+    def __init__(self, total: float):
+        self.total = total
+        self.start = time.perf_counter()
+
+    def remaining(self) -> float:
+        return max(self.total - (time.perf_counter() - self.start), 0.0)
+
+
+class LatencyWindow:
+    """
+    Latencies of the last requests of one operation, to hedge after its usual tail latency.
+    """
+
+    def __init__(self, size: int = 512, percentile: float = HEDGE_PERCENTILE):
+        self.samples = deque(maxlen=size)
+        self.percentile = percentile
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_INITIAL_DELAY
+        ordered = sorted(self.samples)
+        index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+        return max(ordered[index], HEDGE_MIN_DELAY)
+
+
+async def hedged(operation: str, primary, backup, timeout: float, window: LatencyWindow):
+    """
+    Run `primary()` and, if it has not answered after the hedge delay of `window` (or failed
+    before), also run `backup()`; return the first successful answer and cancel the other one.
+
+    Args:
+        operation (str): Name of the operation, used as metric label.
+        primary (callable): Function returning the awaitable of the primary request.
+        backup (callable | None): Function returning the awaitable of the hedged request, or None to only apply the timeout.
+        timeout (float): Seconds left for both requests together.
+        window (LatencyWindow): Recent latencies of the primary request, updated with this one. A
+            primary cancelled because the hedge answered first (or the timeout expired) is recorded
+            with its elapsed time, a lower bound: leaving it out would cut the distribution off at
+            the hedge delay and drag the learned delay down.
+
+    Returns:
+        The result of the first request that succeeded.
+
+    Raises:
+        asyncio.TimeoutError: If no request answered within `timeout`.
+        Exception: The primary's error if every request failed, so a failing backup does not hide
+            why the primary failed.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = {asyncio.ensure_future(primary()): "primary"}
+    hedge_at = start + window.hedge_delay() if backup is not None else None
+    fired = False
+    errors = {}
+    try:
+        while True:
+            now = loop.time()
+            if hedge_at is not None and (now >= hedge_at or not tasks):
+                tasks[asyncio.ensure_future(backup())] = "hedge"
+                hedge_at = None
+                fired = True
+                HEDGES.inc(operation=operation)
+            if not tasks:
+                if fired:
+                    HEDGE_WINS.inc(operation=operation, winner="none")
+                raise errors.get("primary") or errors["hedge"]
+            remaining = start + timeout - now
+            if remaining <= 0:
+                VECTOR_TIMEOUTS.inc(operation=operation)
+                if fired:
+                    HEDGE_WINS.inc(operation=operation, winner="none")
+                raise asyncio.TimeoutError(f"{operation} did not answer within {timeout:.3f}s")
+            wait = remaining if hedge_at is None else min(remaining, hedge_at - now)
+            done, _ = await asyncio.wait(tasks, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = tasks.pop(task)
+                if task.exception() is not None:
+                    errors[source] = task.exception()
+                    continue
+                if source == "primary":
+                    window.observe(loop.time() - start)
+                if fired:
+                    HEDGE_WINS.inc(operation=operation, winner=source)
+                return task.result()
+    finally:
+        for task, source in tasks.items():
+            task.cancel()
+            if source == "primary":
+                window.observe(loop.time() - start)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each request takes one.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it.
+        """
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def on_success(self):
+        """
+        Called after a request succeeded. The fixed bucket ignores it.
+        """
+        pass
+
+    def on_throttle(self, retry_after: float = None):
+        """
+        Called after the server throttled a request. The fixed bucket ignores it.
+        """
+        pass
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token bucket whose rate adapts to the server (additive increase, multiplicative decrease).
+
+    Every successful request raises the rate by about `increase` requests per second each
+    second, up to `max_rate`. A throttled response multiplies the rate by `decrease` and
+    pauses every caller until `Retry-After` has elapsed.
+    """
+
+    def __init__(self, initial_rate: float, max_rate: float, min_rate: float = 1.0,
+                 increase: float = 1.0, decrease: float = 0.5):
+        super().__init__(initial_rate, capacity=max(1.0, initial_rate))
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.throttles = 0
+
+    def _set_rate(self, rate: float):
+        self._refill()
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+    async def acquire(self):
+        delay = self.paused_until - time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.paused_until - time.monotonic()
+        await super().acquire()
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self._set_rate(min(self.max_rate, self.rate + self.increase / self.rate))
+
+    def on_throttle(self, retry_after: float = None):
+        now = time.monotonic()
+        self.throttles += 1
+        # Requests in flight when the limit was hit all fail together; back off once per second
+        if now - self.decreased_at >= 1.0:
+            self.decreased_at = now
+            self._set_rate(max(self.min_rate, self.rate * self.decrease))
+        self.tokens = 0
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
@@ -0,0 +1,230 @@
+import asyncio
+import os
+import random
+import time
+import httpx
+from clients.cache import ResponseCache
+from clients.rate_limit import TokenBucket
+
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3/")
+TMDB_TIMEOUT = float(os.getenv("TMDB_TIMEOUT", "10"))
+TMDB_MAX_CONNECTIONS = int(os.getenv("TMDB_MAX_CONNECTIONS", "20"))
+TMDB_MAX_CONCURRENCY = int(os.getenv("TMDB_MAX_CONCURRENCY", "20"))
+TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", "45"))
+TMDB_MAX_RETRIES = int(os.getenv("TMDB_MAX_RETRIES", "4"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+
+class TMDBError(Exception):
+    """
+    Error returned by the TMDB API after retries were exhausted.
+    """
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CacheMissError(TMDBError):
+    """
+    Raised in replay mode when a request is not in the response cache.
+    """
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """
+    Parse the `Retry-After` header of a response, in seconds.
+
+    Args:
+        response (httpx.Response): The throttled response.
+
+    Returns:
+        float | None: Seconds to wait, or None if the header is missing or not a number.
+    """
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for a retry attempt (0-based).
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def extract_us_certification(release_dates: dict) -> str | None:
+    """
+    Get the first non-empty US certification from a TMDB `release_dates` response.
+
+    Args:
+        release_dates (dict): The `release_dates` object returned by TMDB.
+
+    Returns:
+        str | None: The certification, or None if there is no US certification.
+    """
+    for result in release_dates.get("results", []):
+        if result.get("iso_3166_1") == "US":
+            for release in result.get("release_dates", []):
+                cert = (release.get("certification") or "").strip()
+                if cert:
+                    return cert
+    return None
+
+
+class TMDBClient:
+    """
+    Async TMDB API client with keep-alive pooling, timeouts, bounded concurrency,
+    token-bucket rate limiting and retries with jittered backoff.
+
+    With a `cache`, successful responses are stored and served from it; in `replay` mode
+    the client never touches the network and raises `CacheMissError` on a miss.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = TMDB_BASE_URL,
+        timeout: float = TMDB_TIMEOUT,
+        max_connections: int = TMDB_MAX_CONNECTIONS,
+        max_concurrency: int = TMDB_MAX_CONCURRENCY,
+        rate_limiter=None,
+        max_retries: int = TMDB_MAX_RETRIES,
+        cache: ResponseCache = None,
+        replay: bool = False,
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("TMDB_API_KEY")
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucket(TMDB_RATE_LIMIT)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.cache = cache
+        self.replay = replay
+        self.client = None
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "cache_hits": 0}
+        self.started_at = time.monotonic()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the running event loop
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"accept": "application/json"},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self.client
+
+    async def get_json(self, path: str, params: dict = None) -> dict:
+        """
+        GET a TMDB endpoint and decode its JSON body, retrying throttled and failed requests.
+
+        Args:
+            path (str): Path relative to the API base URL (e.g. "movie/popular").
+            params (dict, optional): Query parameters; the API key is added automatically.
+
+        Returns:
+            dict: The decoded response.
+
+        Raises:
+            TMDBError: If the API key is missing, the response is a non-retryable error,
+                or every retry failed.
+            CacheMissError: In replay mode, if the response is not cached.
+        """
+        cache_key = ResponseCache.make_key(path, params, self.base_url) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached
+        if self.replay:
+            raise CacheMissError(f"{path} is not in the response cache (replay mode)")
+        if not self.api_key:
+            raise TMDBError("TMDB API key not found in environment variables.")
+        query = {**(params or {}), "api_key": self.api_key}
+        client = self._get_client()
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            delay = None
+            try:
+                async with self.semaphore:
+                    await self.rate_limiter.acquire()
+                    self.stats["requests"] += 1
+                    response = await client.get(path, params=query)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise TMDBError(f"Error fetching {path}: {e}") from e
+            else:
+                if response.status_code == 200:
+                    self.rate_limiter.on_success()
+                    data = response.json()
+                    if cache_key is not None:
+                        self.cache.set(cache_key, data)
+                    return data
+                if response.status_code == 429:
+                    self.stats["throttled"] += 1
+                    delay = retry_after_seconds(response)
+                    self.rate_limiter.on_throttle(delay)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise TMDBError(
+                        f"Error fetching {path}: {response.status_code} - {response.text}",
+                        status_code=response.status_code,
+                    )
+            await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+
+    def report(self) -> dict:
+        """
+        Summarize the requests sent so far, including the effective request rate.
+
+        Returns:
+            dict: Request, retry, throttle and failure counts, elapsed seconds and requests per second.
+        """
+        elapsed = time.monotonic() - self.started_at
+        return {
+            **self.stats,
+            "elapsed_seconds": round(elapsed, 2),
+            "requests_per_second": round(self.stats["requests"] / elapsed, 2) if elapsed > 0 else 0.0,
+            "current_rate_limit": round(self.rate_limiter.rate, 2),
+        }
+
+    async def close(self):
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+_shared_client: TMDBClient | None = None
+
+
+def get_shared_tmdb_client() -> TMDBClient:
+    """
+    Get the process-wide TMDB client, creating it on first use.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = TMDBClient()
+    return _shared_client
+
+
+async def close_shared_tmdb_client():
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
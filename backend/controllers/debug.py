@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from observability.debug import is_authorized, profile_store
+
+debug_router = APIRouter()
+
+
+def _check_authorized(request: Request):
+    if not is_authorized(request):
+        raise HTTPException(status_code=403, detail="A valid X-Debug-Token header is required.")
+
+
+@debug_router.get("/debug/profiles", description="List the recorded request profiles")
+async def list_profiles(request: Request):
+    """
+    Endpoint to list the profiles recorded for debugged requests, newest first.
+
+    Returns:
+        list[dict]: Request ID, path, status, duration and sample count of each profile.
+    """
+    _check_authorized(request)
+    return profile_store.list()
+
+
+@debug_router.get("/debug/profiles/{request_id}", response_class=PlainTextResponse, description="Get a request profile")
+async def get_profile(request_id: str, request: Request):
+    """
+    Endpoint to get the sampling profile of a debugged request.
+
+    Args:
+        request_id (str): The X-Request-ID of the profiled request.
+
+    Returns:
+        PlainTextResponse: The samples in collapsed-stack format, ready for a flame graph tool.
+    """
+    _check_authorized(request)
+    profile = profile_store.get(request_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile recorded for request {request_id}.")
+    return PlainTextResponse(profile["stacks"])
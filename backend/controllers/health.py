@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+health_router = APIRouter()
+
+
+@health_router.get("/healthz", description="Liveness probe")
+async def healthz():
+    """
+    Endpoint answering as long as the process serves requests.
+    """
+    return {"status": "ok"}
+
+
+@health_router.get("/readyz", description="Readiness probe")
+async def readyz(request: Request):
+    """
+    Endpoint telling whether startup and warm-up finished.
+
+    Returns:
+        JSONResponse: The startup checks, with status 200 when ready and 503 otherwise.
+    """
+    report = request.app.state.readiness.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
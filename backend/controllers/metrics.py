@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from observability.metrics import metrics_registry
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, description="Metrics in Prometheus text format")
+async def get_metrics():
+    """
+    Endpoint exposing request, stage latency and cache metrics to Prometheus.
+
+    Returns:
+        PlainTextResponse: Every metric in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from models.pagination import PaginatedResponse, Pagination
 from services.movies import MovieService
-from repositories.movies import MoviesRepositoryLocal
-from models.movie import MovieRecommendationResponse
+from observability.http import TimedJSONResponse
+from models.movie import MovieRecommendationResponse, MovieSearchResponse, MovieAutocompleteResponse
 
-movies_router = APIRouter()
+movies_router = APIRouter(default_response_class=TimedJSONResponse)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "columnar": "application/vnd.movies.columnar"}
+logger = logging.getLogger(__name__)
 
-# Initialize the movie service with the TMDB repository
-movie_service = MovieService(MoviesRepositoryLocal())
+
+def get_movie_service(request: Request) -> MovieService:
+    """
+    Get the movie service created by the application lifespan.
+    """
+    return request.app.state.movie_service
+
+
+def is_degraded(request: Request) -> bool:
+    """
+    Whether admission control asked to serve this request without live vector search.
+    """
+    return getattr(request.state, "degraded", False)
 
 
 @movies_router.post("/movies", response_model=PaginatedResponse, description="Get a paginated list of movies")
-async def get_movies(pagination: Pagination):
+async def get_movies(pagination: Pagination, movie_service: MovieService = Depends(get_movie_service)):
     """
     Endpoint to get a paginated list of movies.
     
@@ -29,8 +44,98 @@ async def get_movies(pagination: Pagination):
             detail=f"An error occurred while fetching movies: {str(e)}"
         )
     
+@movies_router.get("/movies/search", response_model=MovieSearchResponse, description="Search movies by title and overview")
+async def search_movies(
+    q: str = Query(..., min_length=1),
+    genres: list[str] = Query(default=[]),
+    maximum_certification: str = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    movie_service: MovieService = Depends(get_movie_service),
+    degraded: bool = Depends(is_degraded),
+):
+    """
+    Endpoint to search movies combining keyword matching and semantic similarity.
+    
+    Args:
+        q (str): Free-text query.
+        genres (list[str]): Genres every movie must have.
+        maximum_certification (str, optional): The maximum certification to filter movies.
+        limit (int): Maximum number of results.
+    
+    Returns:
+        MovieSearchResponse: The movies found, best first.
+    """
+    try:
+        return await movie_service.search_movies(q, genres, maximum_certification, limit, degraded=degraded)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while searching movies: {str(e)}"
+        )
+
+@movies_router.get("/movies/autocomplete", response_model=MovieAutocompleteResponse, description="Complete a movie title")
+async def autocomplete_movies(
+    prefix: str = Query(..., min_length=1),
+    maximum_certification: str = None,
+    limit: int = Query(default=10, ge=1, le=50),
+    movie_service: MovieService = Depends(get_movie_service),
+):
+    """
+    Endpoint to complete a partially typed movie title.
+    
+    Args:
+        prefix (str): Text typed so far; it may start at any word of the title.
+        maximum_certification (str, optional): The maximum certification to filter movies.
+        limit (int): Maximum number of movies.
+    
+    Returns:
+        MovieAutocompleteResponse: The matching movies, most popular first.
+    """
+    try:
+        return await movie_service.autocomplete_movies(prefix, maximum_certification, limit)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while completing movie titles: {str(e)}"
+        )
+
+@movies_router.get("/movies/export", response_class=StreamingResponse, description="Stream the catalog as NDJSON or columnar batches")
+def export_movies(
+    format: str = Query(default="ndjson", pattern="^(ndjson|columnar)$"),
+    genres: list[str] = Query(default=[]),
+    maximum_certification: str = None,
+    movie_service: MovieService = Depends(get_movie_service),
+):
+    """
+    Endpoint to stream the whole catalog, filtered like the listing.
+    
+    The body is produced batch by batch from a database cursor, so memory stays constant
+    whatever the size of the catalog.
+    
+    Args:
+        format (str): "ndjson" for one JSON movie per line, or "columnar" for the framed format read by
+            `catalog.export.read_columnar`.
+        genres (list[str]): Genres every movie must have.
+        maximum_certification (str, optional): The maximum certification to filter movies.
+    
+    Returns:
+        StreamingResponse: The exported movies, most popular first.
+    """
+    try:
+        body = movie_service.export_movies(format, genres, maximum_certification)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    extension = "ndjson" if format == "ndjson" else "moviescol"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="movies.{extension}"'},
+    )
+
 @movies_router.get("/movies/{movie_id}", response_model=MovieRecommendationResponse, description="Get movie details by ID")
-async def get_movie_by_id(movie_id: int, maximum_certification: str = None):
+async def get_movie_by_id(movie_id: int, maximum_certification: str = None,
+                         movie_service: MovieService = Depends(get_movie_service),
+                         degraded: bool = Depends(is_degraded)):
     """
     Endpoint to get movie details by ID.
     
@@ -42,8 +147,8 @@ async def get_movie_by_id(movie_id: int, maximum_certification: str = None):
 
     """
     try:
-        print(f"Fetching movie with ID: {movie_id} and maximum certification: {maximum_certification}")
-        return await movie_service.get_movie_by_id(movie_id, maximum_certification)
+        logger.debug("get_movie movie_id=%s maximum_certification=%s", movie_id, maximum_certification)
+        return await movie_service.get_movie_by_id(movie_id, maximum_certification, degraded=degraded)
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
     except Exception as e:
@@ -1,4 +1,6 @@
+import logging
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 load_dotenv()
@@ -9,11 +11,36 @@ Base = declarative_base()
 
 # Load environment variables
 DATABASE_URL = os.getenv("DATABASE_URL")
-print(f"Connecting to database at {DATABASE_URL}")
+logger = logging.getLogger(__name__)
+logger.info("connecting to database at %s", make_url(DATABASE_URL).render_as_string(hide_password=True))
 
-engine = create_engine(DATABASE_URL)
+# Connections per process; serve.py derives them from the worker count so that all workers
+# together stay under the server's connection limit
+DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+# Server-side limit of every PostgreSQL statement, bounding the database stage of a request's latency budget
+DB_STATEMENT_TIMEOUT_MS = os.getenv("DB_STATEMENT_TIMEOUT_MS")
+
+
+def pool_options() -> dict:
+    """
+    Engine options set through DB_POOL_SIZE, DB_MAX_OVERFLOW and DB_STATEMENT_TIMEOUT_MS; SQLAlchemy's defaults otherwise.
+    """
+    options = {}
+    if DB_STATEMENT_TIMEOUT_MS and DATABASE_URL.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={int(DB_STATEMENT_TIMEOUT_MS)}"}
+    if DB_POOL_SIZE:
+        options["pool_size"] = int(DB_POOL_SIZE)
+    if DB_MAX_OVERFLOW:
+        options["max_overflow"] = int(DB_MAX_OVERFLOW)
+    return options
+
+
+engine = create_engine(DATABASE_URL, **pool_options())
 SessionLocal = sessionmaker(bind=engine)
 
 def init_db():
+    # Register every table, so derived ones referencing the movies (rankings) are dropped before them
+    import db.movies, db.rankings, db.versions
     Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
@@ -5,8 +5,8 @@ from db.db import Base
 movie_genre = Table(
     'movie_genre',
     Base.metadata,
-    Column('movie_id', Integer, ForeignKey('movies.id')),
-    Column('genre_id', Integer, ForeignKey('genres.id'))
+    Column('movie_id', Integer, ForeignKey('movies.id'), index=True),
+    Column('genre_id', Integer, ForeignKey('genres.id'), index=True)
 )
 
 class Certification(Base):
@@ -0,0 +1,105 @@
+import os
+from sqlalchemy import Column, Integer, String, ForeignKey, select, insert, func, literal
+from sqlalchemy.orm import Session, joinedload
+from db.db import Base
+from db.movies import Certification, Genre, Movie
+
+# Positions materialized per listing; deeper pages are computed from the movies table
+RANKING_DEPTH = int(os.getenv("RANKING_DEPTH", "1000"))
+
+
+class PopularRanking(Base):
+    __tablename__ = 'popular_rankings'
+
+    listing_key = Column(String, primary_key=True)
+    position = Column(Integer, primary_key=True)
+    movie_id = Column(Integer, ForeignKey('movies.id'), nullable=False)
+
+
+class PopularRankingCount(Base):
+    __tablename__ = 'popular_ranking_counts'
+
+    listing_key = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False)
+    depth = Column(Integer, nullable=False)
+
+
+def ranking_key(genre: str = None, maximum_certification: str = None) -> str:
+    """
+    Get the key of a materialized listing: at most one genre and a certification ceiling.
+    """
+    return f"{genre or '*'}|{maximum_certification or '*'}"
+
+
+def refresh_popular_rankings(session: Session, depth: int = RANKING_DEPTH) -> int:
+    """
+    Rebuild the materialized popularity rankings of the common listings: no genre or a single
+    genre, combined with no ceiling or each certification ceiling.
+
+    Args:
+        session (Session): Database session.
+        depth (int): Number of positions stored per listing.
+
+    Returns:
+        int: Number of listings materialized.
+    """
+    bind = session.get_bind()
+    PopularRanking.__table__.create(bind, checkfirst=True)
+    PopularRankingCount.__table__.create(bind, checkfirst=True)
+    session.query(PopularRanking).delete()
+    session.query(PopularRankingCount).delete()
+
+    genres = [None] + sorted({name for name, in session.query(Genre.name)})
+    certifications = [None] + session.query(Certification).all()
+    for genre in genres:
+        for certification in certifications:
+            filters = []
+            if genre:
+                filters.append(Movie.genres.any(Genre.name == genre))
+            if certification:
+                filters.append(Movie.certification.has(Certification.min_age <= certification.min_age))
+            key = ranking_key(genre, certification.certification if certification else None)
+
+            ranked = select(
+                Movie.id.label('movie_id'),
+                func.row_number().over(order_by=(Movie.popularity.desc(), Movie.id)).label('position')
+            ).where(*filters).subquery()
+            session.execute(insert(PopularRanking).from_select(
+                ['listing_key', 'position', 'movie_id'],
+                select(literal(key), ranked.c.position, ranked.c.movie_id).where(ranked.c.position <= depth)
+            ))
+            total = session.execute(select(func.count()).select_from(Movie).where(*filters)).scalar()
+            session.add(PopularRankingCount(listing_key=key, total=total, depth=depth))
+    session.commit()
+    return len(genres) * len(certifications)
+
+
+def get_ranked_page(session: Session, key: str, offset: int, limit: int) -> tuple[int, list[Movie]] | None:
+    """
+    Read a listing page from the materialized rankings.
+
+    Args:
+        session (Session): Database session.
+        key (str): Listing key, see `ranking_key`.
+        offset (int): Number of movies to skip.
+        limit (int): Maximum number of movies.
+
+    Returns:
+        tuple[int, list[Movie]] | None: The total and the page, or None if the page is not materialized.
+    """
+    count = session.get(PopularRankingCount, key)
+    if count is None or (offset + limit > count.depth and count.total > count.depth):
+        return None
+    movies = (
+        session.query(Movie)
+        .join(PopularRanking, PopularRanking.movie_id == Movie.id)
+        .options(joinedload(Movie.certification))
+        .filter(
+            PopularRanking.listing_key == key,
+            PopularRanking.position > offset,
+            PopularRanking.position <= offset + limit
+        )
+        .order_by(PopularRanking.position)
+        .all()
+    )
+    return count.total, movies
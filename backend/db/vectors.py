@@ -0,0 +1,286 @@
+import os
+import re
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    VectorParams, Distance, HnswConfigDiff,
+    CreateAliasOperation, CreateAlias, DeleteAliasOperation, DeleteAlias,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig,
+    SearchParams, QuantizationSearchParams,
+)
+
+# Name the API searches; it is an alias pointing at the live versioned collection
+MOVIES_ALIAS = os.getenv("QDRANT_COLLECTION", "movies")
+KEEP_VERSIONS = int(os.getenv("QDRANT_KEEP_VERSIONS", "2"))
+# Transport shared by the loaders and the API; gRPC needs the gRPC port exposed, which hosted deployments often lack
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+
+# Vector quantization: "none", "scalar" (int8) or "binary". Quantized vectors stay in RAM,
+# originals move to disk and are only read to rescore the oversampled candidates.
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+QDRANT_RESCORE = os.getenv("QDRANT_RESCORE", "true").lower() == "true"
+HNSW_M = 16
+HNSW_EF_CONSTRUCT = 200
+
+
+def collection_versions(client: QdrantClient, alias: str = MOVIES_ALIAS) -> dict[int, str]:
+    """
+    List the versioned collections (`{alias}_v{n}`) of an alias.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        alias (str): The alias name.
+
+    Returns:
+        dict[int, str]: Collection names by version number.
+    """
+    pattern = re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+    versions = {}
+    for collection in client.get_collections().collections:
+        match = pattern.match(collection.name)
+        if match:
+            versions[int(match.group(1))] = collection.name
+    return versions
+
+
+def current_collection(client: QdrantClient, alias: str = MOVIES_ALIAS) -> str | None:
+    """
+    Get the collection an alias currently points to.
+
+    Returns:
+        str | None: The collection name, or None if the alias does not exist.
+    """
+    for collection_alias in client.get_aliases().aliases:
+        if collection_alias.alias_name == alias:
+            return collection_alias.collection_name
+    return None
+
+
+def next_collection_name(client: QdrantClient, alias: str = MOVIES_ALIAS) -> str:
+    versions = collection_versions(client, alias)
+    return f"{alias}_v{max(versions, default=0) + 1}"
+
+
+def quantization_config(quantization: str = QDRANT_QUANTIZATION):
+    """
+    Get the Qdrant quantization config of a quantization mode.
+
+    Args:
+        quantization (str): "none", "scalar" or "binary".
+
+    Returns:
+        ScalarQuantization | BinaryQuantization | None: The config, or None without quantization.
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+    if quantization == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def collection_quantization(info) -> str:
+    """
+    Get the quantization mode a collection was built with, from its `get_collection` info.
+
+    Returns:
+        str: "none", "scalar" or "binary".
+    """
+    vectors = info.config.params.vectors
+    config = getattr(vectors, "quantization_config", None) or info.config.quantization_config
+    if isinstance(config, ScalarQuantization):
+        return "scalar"
+    if isinstance(config, BinaryQuantization):
+        return "binary"
+    return "none"
+
+
+def search_params(quantization: str = QDRANT_QUANTIZATION, oversampling: float = QDRANT_OVERSAMPLING,
+                  rescore: bool = QDRANT_RESCORE, hnsw_ef: int = None) -> SearchParams | None:
+    """
+    Get the search params matching a quantization mode: oversample candidates on the
+    quantized vectors, then rescore them with the original vectors.
+
+    Returns:
+        SearchParams | None: The params, or None when the defaults apply.
+    """
+    if quantization == "none":
+        return SearchParams(hnsw_ef=hnsw_ef) if hnsw_ef else None
+    return SearchParams(
+        hnsw_ef=hnsw_ef,
+        quantization=QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    )
+
+
+def create_movies_collection(client: QdrantClient, collection_name: str, size: int,
+                             quantization: str = QDRANT_QUANTIZATION, m: int = HNSW_M,
+                             ef_construct: int = HNSW_EF_CONSTRUCT):
+    """
+    Create a movies collection with the cosine distance, HNSW and quantization settings used by the API.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection_name (str): Name of the collection to create.
+        size (int): Dimension of the embeddings.
+        quantization (str): "none", "scalar" or "binary".
+        m (int): HNSW edges per node.
+        ef_construct (int): HNSW candidate list size while building.
+    """
+    config = quantization_config(quantization)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(
+            size=size,
+            distance=Distance.COSINE,
+            hnsw_config=HnswConfigDiff(ef_construct=ef_construct, m=m),
+            quantization_config=config,
+            on_disk=True if config is not None else None
+        )
+    )
+
+
+def estimate_memory(count: int, dimension: int, quantization: str = QDRANT_QUANTIZATION, m: int = HNSW_M) -> dict:
+    """
+    Estimate the RAM a collection needs: vectors kept in memory plus the HNSW graph links.
+
+    Args:
+        count (int): Number of points.
+        dimension (int): Dimension of the embeddings.
+        quantization (str): "none", "scalar" or "binary".
+        m (int): HNSW edges per node (layer 0 holds 2 * m links of 4 bytes).
+
+    Returns:
+        dict: Bytes for vectors, graph and total, plus the bytes of originals moved to disk.
+    """
+    original = count * dimension * 4
+    vectors = {"none": original, "scalar": count * dimension, "binary": count * ((dimension + 7) // 8)}[quantization]
+    graph = count * m * 2 * 4
+    return {
+        "vectors_bytes": vectors,
+        "graph_bytes": graph,
+        "ram_bytes": vectors + graph,
+        "disk_bytes": original if quantization != "none" else 0,
+    }
+
+
+def swap_alias(client: QdrantClient, collection_name: str, alias: str = MOVIES_ALIAS) -> str | None:
+    """
+    Point the alias at a collection. The delete and create run in one atomic request,
+    so searches through the alias never fail while the swap happens.
+
+    The exception is the one-time migration from a legacy collection that has the alias name
+    itself: an alias cannot shadow a collection, so that collection is deleted first, and
+    searches fail from that delete until the alias is created right after it.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection_name (str): Collection the alias must point to.
+        alias (str): The alias name.
+
+    Returns:
+        str | None: The collection the alias pointed to before, if any.
+    """
+    previous = current_collection(client, alias)
+    operations = []
+    if previous is not None:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=collection_name, alias_name=alias)))
+
+    # Everything is prepared beforehand to keep the outage of the migration as short as possible
+    if any(collection.name == alias for collection in client.get_collections().collections):
+        print(f"[WARN] Eliminando la colección heredada '{alias}' para reemplazarla por un alias; "
+              f"las búsquedas fallarán hasta que se cree el alias (migración única).")
+        client.delete_collection(alias)
+    client.update_collection_aliases(change_aliases_operations=operations)
+    return previous
+
+
+def delete_alias(client: QdrantClient, alias: str = MOVIES_ALIAS):
+    client.update_collection_aliases(
+        change_aliases_operations=[DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias))]
+    )
+
+
+def rollback_alias(client: QdrantClient, alias: str = MOVIES_ALIAS) -> str:
+    """
+    Point the alias back at the newest version older than the current one.
+
+    Returns:
+        str: The collection the alias points to after the rollback.
+    """
+    versions = collection_versions(client, alias)
+    current = current_collection(client, alias)
+    current_version = next((version for version, name in versions.items() if name == current), None)
+    older = [version for version in versions if current_version is None or version < current_version]
+    if not older:
+        raise Exception(f"No hay una versión anterior de '{alias}' a la que volver.")
+    target = versions[max(older)]
+    swap_alias(client, target, alias)
+    return target
+
+
+def prune_versions(client: QdrantClient, alias: str = MOVIES_ALIAS, keep: int = KEEP_VERSIONS) -> list[str]:
+    """
+    Delete old versioned collections, keeping the newest `keep` ones up to the live one.
+
+    Versions newer than the live one were never published (a build in progress, or one that
+    crashed before its cleanup), so they neither count among the kept versions nor get deleted.
+
+    Returns:
+        list[str]: The deleted collections.
+    """
+    versions = collection_versions(client, alias)
+    current = current_collection(client, alias)
+    current_version = next((version for version, name in versions.items() if name == current), None)
+    published = [version for version in versions if current_version is None or version <= current_version]
+    kept = set(sorted(published, reverse=True)[:keep])
+    deleted = []
+    for version in published:
+        name = versions[version]
+        if version not in kept and name != current:
+            client.delete_collection(name)
+            deleted.append(name)
+    return deleted
+
+
+def sample_recall(client: QdrantClient, collection_name: str, ids, vectors: np.ndarray,
+                  sample_size: int = 100, k: int = 10, seed: int = 0,
+                  params: SearchParams | None = None) -> float:
+    """
+    Measure recall@k of a collection against exact cosine top-k on a sample of its own vectors.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection_name (str): Collection to check.
+        ids (list): Point IDs, aligned with `vectors`.
+        vectors (np.ndarray): The (n, dim) matrix that was uploaded.
+        sample_size (int): Number of query vectors to sample.
+        k (int): Number of neighbours compared.
+        seed (int): Seed of the sample.
+        params (SearchParams, optional): Search params, e.g. quantization rescoring.
+
+    Returns:
+        float: Mean fraction of the exact top-k found by the collection.
+    """
+    if len(ids) == 0:
+        return 1.0
+    ids = np.asarray(ids)
+    normalized = np.asarray(vectors, dtype=np.float32)
+    normalized = normalized / np.maximum(np.linalg.norm(normalized, axis=1, keepdims=True), 1e-12)
+    rows = np.random.default_rng(seed).choice(len(ids), size=min(sample_size, len(ids)), replace=False)
+    k = min(k, len(ids))
+    hits = 0
+    for row in rows:
+        scores = normalized @ normalized[row]
+        exact = set(ids[np.argpartition(-scores, k - 1)[:k]].tolist())
+        found = client.search(
+            collection_name=collection_name, query_vector=np.array(vectors[row]), limit=k,
+            search_params=params, with_payload=False
+        )
+        hits += len(exact.intersection(point.id for point in found))
+    return hits / (len(rows) * k)
@@ -0,0 +1,87 @@
+import select
+import time
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from db.db import Base, engine
+
+# Postgres channel notified every time a new catalog version is published
+CATALOG_CHANNEL = "catalog_changed"
+
+
+class CatalogVersion(Base):
+    __tablename__ = 'catalog_versions'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(String, nullable=False, unique=True)
+    source = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+def bump_catalog_version(session: Session, source: str, version: str = None) -> str:
+    """
+    Publish a new catalog version and notify every API process listening for it.
+
+    On PostgreSQL the NOTIFY is sent in the same transaction, so listeners only hear about
+    versions that were committed.
+
+    Args:
+        session (Session): Database session.
+        source (str): What changed the catalog, e.g. the ingestion script.
+        version (str, optional): Version to publish. Defaults to a timestamp.
+
+    Returns:
+        str: The published version.
+    """
+    CatalogVersion.__table__.create(session.get_bind(), checkfirst=True)
+    version = version or str(time.time_ns())
+    session.add(CatalogVersion(version=version, source=source))
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text("SELECT pg_notify(:channel, :version)"), {"channel": CATALOG_CHANNEL, "version": version})
+    session.commit()
+    return version
+
+
+def latest_catalog_version(session: Session) -> str | None:
+    """
+    Get the last published catalog version, or None if none was published.
+    """
+    if not engine.dialect.has_table(session.connection(), CatalogVersion.__tablename__):
+        return None
+    latest = session.query(CatalogVersion.version).order_by(CatalogVersion.id.desc()).first()
+    return latest[0] if latest else None
+
+
+def listen_for_catalog_versions(callback, stop_event, timeout: float = 5.0) -> bool:
+    """
+    Call `callback(version)` for every catalog version published, until `stop_event` is set.
+
+    Blocks the calling thread on a dedicated LISTEN connection, opened outside the engine's pool
+    so it never takes a connection from request queries; reconnecting after errors is left to
+    the caller.
+
+    Args:
+        callback (callable): Function receiving the published version.
+        stop_event (threading.Event): Event ending the loop.
+        timeout (float): Seconds between checks of `stop_event`.
+
+    Returns:
+        bool: False if the database does not support notifications (not PostgreSQL).
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+    listener_engine = create_engine(engine.url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    try:
+        with listener_engine.connect() as connection:
+            connection.execute(text(f"LISTEN {CATALOG_CHANNEL}"))
+            driver_connection = connection.connection.driver_connection
+            while not stop_event.is_set():
+                if select.select([driver_connection], [], [], timeout) == ([], [], []):
+                    continue
+                driver_connection.poll()
+                while driver_connection.notifies:
+                    callback(driver_connection.notifies.pop(0).payload)
+    finally:
+        listener_engine.dispose()
+    return True
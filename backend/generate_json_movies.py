@@ -1,15 +1,15 @@
 import asyncio
-import aiohttp
 import os
-import requests
 import time
 from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
 from qdrant_client.models import VectorParams, Distance, HnswConfigDiff, PointStruct
 from sqlalchemy import text
 from db.movies import Movie, Genre, Certification
+from db.rankings import refresh_popular_rankings
+from catalog.registry import publish_catalog
 from db.db import SessionLocal
-from aiolimiter import AsyncLimiter
+from clients.crawl import fetch_movie_genres, fetch_movie_pages_in_range, get_movie_details_for_movies, get_embedding_text
 
 # Config
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
@@ -17,10 +17,6 @@ QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
 START_PAGE = 1
 END_PAGE = 1
 
-MAX_RATE = 45
-MINIMUM_TIME = 1
-
-headers = {"accept": "application/json"}
 model = SentenceTransformer('all-mpnet-base-v2')
 qdrant_client = QdrantClient(url=QDRANT_URL)
 
@@ -31,12 +27,7 @@ VALID_CERTIFICATIONS = {
 }
 
 def get_movie_genres():
-    url_genres = "https://api.themoviedb.org/3/genre/movie/list"
-    params = {"language": "es", "api_key": TMDB_API_KEY}
-    response = requests.get(url_genres, headers=headers, params=params)
-    if response.status_code == 200:
-        return {genre['id']: genre['name'] for genre in response.json()['genres']}
-    raise Exception(f"Error fetching genres: {response.status_code}")
+    return asyncio.run(fetch_movie_genres())
 
 def clean_movie_data(movie, genres):
     return {
@@ -58,72 +49,10 @@ def clean_movie_data(movie, genres):
 def clean_movies_data(movies, genres):
     return [clean_movie_data(movie, genres) for movie in movies]
 
-async def fetch_movie_page(session, page, rate_limiter):
-    url = "https://api.themoviedb.org/3/movie/popular"
-    params = {"language": "es", "page": page, "api_key": TMDB_API_KEY, "include_adult": "false"}
-    try:
-        async with rate_limiter:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status != 200:
-                    print(f"Error fetching page {page}: {response.status}")
-                    return []
-                data = await response.json()
-                return data.get("results", [])
-    except Exception as e:
-        print(f"Error fetching page {page}: {e}")
-        return []
-
-async def fetch_movie_pages_in_range(start_page, end_page):
-    movies = []
-    connector = aiohttp.TCPConnector(limit=10)
-    rate_limiter = AsyncLimiter(MAX_RATE, MINIMUM_TIME)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        tasks = [fetch_movie_page(session, page, rate_limiter) for page in range(start_page, end_page + 1)]
-        results = await asyncio.gather(*tasks)
-        for page_movies in results:
-            movies.extend(page_movies)
-    return movies
-
-async def fetch_certification(session, movie_id, rate_limiter):
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}/release_dates"
-    try:
-        async with rate_limiter:
-            async with session.get(url, params={"api_key": TMDB_API_KEY}, headers=headers) as resp:
-                if resp.status != 200:
-                    return movie_id, None
-                data = await resp.json()
-                for result in data.get("results", []):
-                    if result["iso_3166_1"] == "US":
-                        for release in result.get("release_dates", []):
-                            cert = release.get("certification", "").strip()
-                            if cert:
-                                return movie_id, cert
-    except:
-        pass
-    return movie_id, None
-
-async def get_certifications_for_movies(movie_list):
-    result = {}
-    connector = aiohttp.TCPConnector(limit=20)
-    limiter = AsyncLimiter(MAX_RATE, MINIMUM_TIME)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        tasks = [fetch_certification(session, m["id"], limiter) for m in movie_list]
-        for future in asyncio.as_completed(tasks):
-            mid, cert = await future
-            if cert:
-                result[mid] = cert
-    return result
-
-def get_movie_embeddings(movie):
+def get_movie_embeddings(movie, details):
     try:
-        url = f"https://api.themoviedb.org/3/movie/{movie['id']}"
-        response = requests.get(url, headers=headers, params={"api_key": TMDB_API_KEY})
-        if response.status_code == 200:
-            data = response.json()
-            text = f"{data.get('title', '')}. {data.get('overview', '')}. " + \
-                   ", ".join([g['name'] for g in data.get('genres', [])]) + ". " + \
-                   ", ".join([p['name'] for p in data.get('production_companies', [])])
-            return model.encode(text, convert_to_tensor=True).tolist()
+        text = get_embedding_text(details)
+        return model.encode(text, convert_to_tensor=True).tolist()
     except Exception as e:
         print(f"Error embedding movie {movie['id']}: {e}")
     return None
@@ -131,7 +60,8 @@ def get_movie_embeddings(movie):
 def upload_movies_to_db(movies):
     session = SessionLocal()
 
-    certifications = asyncio.run(get_certifications_for_movies(movies))
+    # One request per movie feeds both the certification filter and the embedding text
+    details = asyncio.run(get_movie_details_for_movies(movies))
     processed_ids = set()
 
     existing_certs = {c.certification for c in session.query(Certification).all()}
@@ -149,12 +79,13 @@ def upload_movies_to_db(movies):
         if not movie['genres']:
             continue
 
-        cert = certifications.get(movie['id'])
+        movie_details = details.get(movie['id'])
+        cert = movie_details['certification'] if movie_details else None
         if cert not in VALID_CERTIFICATIONS:
             continue
 
         movie['certification'] = cert
-        embedding = get_movie_embeddings(movie)
+        embedding = get_movie_embeddings(movie, movie_details)
         if not embedding:
             continue
 
@@ -196,6 +127,10 @@ def upload_movies_to_db(movies):
         qdrant_client.upsert(collection_name='movies', points=qdrant_movies)
 
     session.commit()
+    # Listing rankings are rebuilt once the catalog is complete
+    refresh_popular_rankings(session)
+    # Tell the running API processes to drop their cached catalog data
+    publish_catalog(session, "generate_json_movies")
     session.close()
 
 
@@ -1,14 +1,93 @@
 from dotenv import load_dotenv
 load_dotenv()
+import logging
+import os
+# Configured before the other imports so that messages logged at import time are formatted too
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s"
+)
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from controllers.movies import movies_router
+from controllers.metrics import metrics_router
+from controllers.debug import debug_router
+from controllers.health import health_router
+from observability.http import metrics_middleware
+from observability.debug import debug_middleware
+from repositories.movies import MoviesRepositoryLocal
+from repositories.recommendations import close_shared_qdrant_clients
+from services.movies import MovieService
+from services.health import Readiness
+from services.warmup import warm_up_popular, WARMUP_TOP_N
+from services.admission import admission_middleware, create_admission_controllers
+from clients.tmdb import close_shared_tmdb_client
+from catalog.registry import catalog_registry
+from catalog.text_index import InvertedIndex
+from catalog.prefix_index import PrefixIndex
+from catalog.engine import CatalogEngine
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger(__name__)
+# Build the catalog indexes in the background after startup; /readyz reports 503 until they are built
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+CATALOG_INDEXES = (("text", InvertedIndex), ("prefix", PrefixIndex), ("listing", CatalogEngine))
+
 # Initialize FastAPI app
 origins = "*"
 
-app = FastAPI()
-# Configure CORS
+async def warm_up(readiness: Readiness, movie_service: MovieService):
+    """
+    Load the catalog and build the listing and search indexes, off the event loop, then cache
+    the responses of the most popular movies (WARMUP_TOP_N).
+
+    A failure is reported by /readyz but does not keep the process unready: the indexes are
+    built on first use and the listing falls back to the database meanwhile.
+    """
+    for name, _ in CATALOG_INDEXES:
+        readiness.set(f"index:{name}", "pending")
+    for name, builder in CATALOG_INDEXES:
+        try:
+            await asyncio.to_thread(catalog_registry.get_index, name, builder)
+            readiness.set(f"index:{name}", "ok")
+        except Exception as e:
+            logger.warning("index %s not built at startup, it will be built on first use: %s", name, e)
+            readiness.set(f"index:{name}", "failed")
+    if WARMUP_TOP_N > 0:
+        await warm_up_popular(movie_service, readiness)
+    readiness.mark_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.readiness = Readiness()
+    app.state.movie_service = MovieService(MoviesRepositoryLocal())
+    app.state.admission = create_admission_controllers()
+    warmup_task = None
+    if STARTUP_WARMUP:
+        warmup_task = asyncio.create_task(warm_up(app.state.readiness, app.state.movie_service))
+    else:
+        app.state.readiness.mark_ready()
+    # Reload the catalog and its indexes, and drop cached responses, when a new version is
+    # published: notified by PostgreSQL, with periodic version checks as a fallback
+    catalog_registry.start_change_listener()
+    catalog_registry.start_auto_refresh()
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    catalog_registry.stop()
+    # Release the pooled Qdrant and TMDB connections on shutdown
+    await close_shared_qdrant_clients()
+    await close_shared_tmdb_client()
+
+app = FastAPI(lifespan=lifespan)
+# Added first so it runs innermost: shed requests are still timed and counted by the outer middlewares
+app.middleware("http")(admission_middleware)
+app.middleware("http")(debug_middleware)
+app.middleware("http")(metrics_middleware)
+# Configure CORS, added last so it runs outermost: preflights are answered before admission
+# control, and the browser can read shed 503 responses and their Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[origins],
@@ -18,4 +97,7 @@ app.add_middleware(
 )
 
 # Include the movies router
-app.include_router(movies_router, prefix="/api", tags=["movies"])
\ No newline at end of file
+app.include_router(movies_router, prefix="/api", tags=["movies"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(debug_router, tags=["debug"])
+app.include_router(health_router, tags=["health"])
@@ -73,6 +73,45 @@ class Movie(BaseModel):
         """
         return [Movie.from_db_model(db_model) for db_model in db_model_list] if db_model_list else []
 
+    @staticmethod
+    def from_snapshot(snapshot, row: int):
+        """
+        Create a Movie instance from a row of the in-memory catalog.
+        
+        Args:
+            snapshot (CatalogSnapshot): The catalog snapshot.
+            row (int): Row of the movie in the snapshot.
+        
+        Returns:
+            Movie: An instance of the Movie class.
+        """
+        return Movie(
+            id=int(snapshot.ids[row]),
+            title=snapshot.columns['title'][row],
+            release_date=snapshot.columns['release_date'][row],
+            poster_path=snapshot.columns['poster_path'][row],
+            certification=snapshot.certification(row) or 'N/A'  # Default to 'N/A' if not provided
+        )
+
+    @staticmethod
+    def from_record(record):
+        """
+        Create a Movie instance from a record of the listing engine.
+        
+        Args:
+            record (MovieRecord): View of a movie of the catalog engine.
+        
+        Returns:
+            Movie: An instance of the Movie class.
+        """
+        return Movie(
+            id=record.id,
+            title=record.title,
+            release_date=record.release_date,
+            poster_path=record.poster_path,
+            certification=record.certification or 'N/A'  # Default to 'N/A' if not provided
+        )
+
 class MovieDetails(BaseModel):
     """
     Movie model representing a movie entity.
@@ -225,4 +264,25 @@ class MovieRecommendationResponse(BaseModel):
     MovieRecommendationResponse model representing a response containing movie recommendations.
     """
     results: list[MovieRecommendation]
-    searched_movie: MovieDetails
\ No newline at end of file
+    searched_movie: MovieDetails
+
+class MovieSearchResult(BaseModel):
+    """
+    MovieSearchResult model representing a movie found by a text search.
+    """
+    movie: Movie
+    score: float
+
+class MovieSearchResponse(BaseModel):
+    """
+    MovieSearchResponse model representing the results of a text search.
+    """
+    query: str
+    results: list[MovieSearchResult]
+
+class MovieAutocompleteResponse(BaseModel):
+    """
+    MovieAutocompleteResponse model representing the title completions of a prefix.
+    """
+    prefix: str
+    results: list[Movie]
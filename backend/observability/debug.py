@@ -0,0 +1,162 @@
+import asyncio
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from fastapi import Request
+from observability.metrics import request_timings
+
+# Debugging is disabled unless a token is configured; callers send it in the X-Debug-Token header,
+# never in the query string, which ends up in access logs
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "50"))
+PROFILE_MAX_DEPTH = 64
+
+
+def is_authorized(request: Request) -> bool:
+    """
+    Check whether a request carries the debug token in its X-Debug-Token header.
+    """
+    if not DEBUG_TOKEN:
+        return False
+    token = request.headers.get("x-debug-token") or ""
+    return hmac.compare_digest(token.encode(), DEBUG_TOKEN.encode())
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval from a background thread.
+
+    The API handles requests on the event loop thread, so the samples show where that
+    thread spent its time while the profiled request ran, including time spent on other
+    requests interleaved with it.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self.thread.start()
+        return self
+
+    async def stop(self):
+        """
+        Stop sampling and wait for the sampling thread without blocking the event loop.
+        """
+        self.stop_event.set()
+        await asyncio.to_thread(self.thread.join)
+
+    def collapsed(self) -> str:
+        """
+        Render the samples in the collapsed-stack format read by flame graph tools.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class ProfileStore:
+    """
+    Keeps the profiles of the last requests, retrievable by request ID.
+    """
+
+    def __init__(self, maxsize: int = PROFILE_HISTORY):
+        self.maxsize = maxsize
+        self.profiles: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, request_id: str, profile: dict):
+        with self.lock:
+            self.profiles[request_id] = profile
+            while len(self.profiles) > self.maxsize:
+                self.profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> dict | None:
+        with self.lock:
+            return self.profiles.get(request_id)
+
+    def list(self) -> list[dict]:
+        with self.lock:
+            return [
+                {key: value for key, value in profile.items() if key != "stacks"}
+                for profile in reversed(self.profiles.values())
+            ]
+
+
+profile_store = ProfileStore()
+
+
+def server_timing(timings: list[tuple[str, float]], total: float) -> str:
+    """
+    Format per-stage durations as a Server-Timing header, summing repeated stages.
+    """
+    stages: dict[str, list] = {}
+    for name, seconds in timings:
+        stage = stages.setdefault(name, [0.0, 0])
+        stage[0] += seconds
+        stage[1] += 1
+    entries = [f'{name};dur={seconds * 1000:.2f};desc="{count}x"' for name, (seconds, count) in stages.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+async def debug_middleware(request: Request, call_next):
+    """
+    For authorized callers, add a Server-Timing header with the duration of each stage and,
+    with X-Debug-Profile: 1 (or ?profile=1), record a sampling profile of the request.
+    """
+    if not is_authorized(request):
+        return await call_next(request)
+
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    profiled = (request.headers.get("x-debug-profile") or request.query_params.get("profile")) == "1"
+    timings = []
+    token = request_timings.set(timings)
+    profiler = SamplingProfiler(threading.get_ident()).start() if profiled else None
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        total = time.perf_counter() - start
+        if profiler is not None:
+            await profiler.stop()
+        request_timings.reset(token)
+
+    response.headers["Server-Timing"] = server_timing(timings, total)
+    response.headers["X-Request-ID"] = request_id
+    if profiler is not None:
+        profile_store.add(request_id, {
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 2),
+            "samples": profiler.samples,
+            "interval_ms": profiler.interval * 1000,
+            "stacks": profiler.collapsed(),
+        })
+        response.headers["X-Profile"] = f"/debug/profiles/{request_id}"
+    return response
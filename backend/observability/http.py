@@ -0,0 +1,37 @@
+import time
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from observability.metrics import REQUEST_LATENCY, REQUESTS, stage
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSON response recording the time spent encoding its body as the "serialization" stage.
+    """
+
+    def render(self, content) -> bytes:
+        with stage("serialization"):
+            return super().render(content)
+
+
+async def metrics_middleware(request: Request, call_next):
+    """
+    Record the latency and status of every request, labelled by route template, or by endpoint
+    class for requests shed by admission control before routing.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        labels = {
+            "method": request.method,
+            # The template ("/api/movies/{movie_id}") keeps the number of label values bounded
+            "route": route.path if route is not None else getattr(request.state, "shed_endpoint", "unmatched"),
+            "status": str(status),
+        }
+        REQUEST_LATENCY.observe(time.perf_counter() - start, **labels)
+        REQUESTS.inc(**labels)
@@ -0,0 +1,213 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+# Latency buckets in seconds, from sub-millisecond in-memory lookups to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (stage, seconds) pairs of the current request, collected only while debugging it
+request_timings: ContextVar[list | None] = ContextVar("request_timings", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self.lock:
+            values = dict(self.values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in values.items()]
+
+
+class Gauge(Counter):
+    """
+    Value that can go up and down, optionally split by labels.
+    """
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values, optionally split by labels.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self.values: dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, **labels) -> "Timer":
+        return Timer(self, labels)
+
+    def samples(self) -> list[str]:
+        with self.lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self.values.items()}
+        lines = []
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Timer:
+    """
+    Context manager observing the time spent in its block into a histogram. With a `name`,
+    the time is also added to the timings of the current request when it is being debugged.
+    """
+
+    __slots__ = ("histogram", "labels", "name", "start", "elapsed")
+
+    def __init__(self, histogram: Histogram, labels: dict, name: str = None):
+        self.histogram = histogram
+        self.labels = labels
+        self.name = name
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram.observe(self.elapsed, **self.labels)
+        if self.name is not None:
+            timings = request_timings.get()
+            if timings is not None:
+                timings.append((self.name, self.elapsed))
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+REQUEST_LATENCY = metrics_registry.histogram(
+    "http_request_duration_seconds", "Time to answer an HTTP request.", ("method", "route", "status")
+)
+REQUESTS = metrics_registry.counter(
+    "http_requests_total", "HTTP requests answered.", ("method", "route", "status")
+)
+STAGE_LATENCY = metrics_registry.histogram(
+    "movies_stage_duration_seconds",
+    "Time spent in each stage of a request: db_query, catalog_engine, text_search, query_embedding, vector_search, in_process_search, neighbours, hydration, serialization.",
+    ("stage",)
+)
+CACHE_REQUESTS = metrics_registry.counter(
+    "movies_cache_requests_total", "Response cache lookups.", ("cache", "result")
+)
+ADMISSION_QUEUE_DEPTH = metrics_registry.gauge(
+    "movies_admission_queue_depth", "Requests waiting for a slot, per endpoint class.", ("endpoint",)
+)
+ADMISSION_IN_FLIGHT = metrics_registry.gauge(
+    "movies_admission_in_flight", "Requests being handled, per endpoint class.", ("endpoint",)
+)
+ADMISSION_WAIT = metrics_registry.histogram(
+    "movies_admission_wait_seconds", "Time admitted requests waited for a slot.", ("endpoint",)
+)
+ADMISSION_SHED = metrics_registry.counter(
+    "movies_admission_shed_total", "Requests rejected with 503: queue_full, deadline or timeout.", ("endpoint", "reason")
+)
+HEDGES = metrics_registry.counter(
+    "movies_vector_hedges_total", "Hedged requests sent because the primary vector search was slow or failed.", ("operation",)
+)
+HEDGE_WINS = metrics_registry.counter(
+    "movies_vector_hedge_wins_total", "Hedged vector searches by the request that answered first: primary, hedge or none.",
+    ("operation", "winner")
+)
+VECTOR_TIMEOUTS = metrics_registry.counter(
+    "movies_vector_search_timeouts_total", "Vector searches abandoned because the latency budget ran out.", ("operation",)
+)
+EXPORTED_MOVIES = metrics_registry.counter(
+    "movies_exported_total", "Movies streamed by catalog exports, by format.", ("format",)
+)
+DEGRADED_RESPONSES = metrics_registry.counter(
+    "movies_degraded_responses_total", "Requests served in degraded mode, without live vector search.", ("endpoint",)
+)
+
+
+def stage(name: str) -> Timer:
+    """
+    Time a stage of the current request, e.g. `with stage("vector_search"): ...`.
+    """
+    return Timer(STAGE_LATENCY, {"stage": name}, name)
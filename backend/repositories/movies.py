@@ -1,12 +1,47 @@
-from abc import ABC, abstractmethod
-import requests
+import logging
 import os
+from abc import ABC, abstractmethod
+from typing import Iterator
 from models.movie import MovieDetails, Movie
-from db.movies import Certification, Movie as MovieModel, Genre as GenreModel
+from db.movies import Certification, Movie as MovieModel, Genre as GenreModel, movie_genre
 from db.db import SessionLocal
+from db.rankings import ranking_key, get_ranked_page
+from catalog.snapshot import CatalogSnapshot, open_default_snapshot, VALID_CERTIFICATIONS
+from catalog.registry import CatalogRegistry, catalog_registry
+from catalog.engine import CatalogEngine
+from clients.tmdb import TMDBClient, TMDBError, extract_us_certification, get_shared_tmdb_client
 from models.pagination import Pagination, PaginatedResponse
+from observability.metrics import stage
 from sqlalchemy import select, func
 
+logger = logging.getLogger(__name__)
+# Rows fetched per round trip by catalog exports, bounding their memory regardless of the catalog size
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+
+def listing_conditions(genres: list[str] = None, maximum_certification: str = None) -> list:
+    """
+    SQL conditions of the listing filters: movies with every genre in `genres` and a
+    certification no stricter than `maximum_certification`.
+    """
+    conditions = []
+    if genres:
+        matching = (
+            select(movie_genre.c.movie_id)
+            .join(GenreModel, GenreModel.id == movie_genre.c.genre_id)
+            .where(GenreModel.name.in_(genres))
+            .group_by(movie_genre.c.movie_id)
+            .having(func.count(func.distinct(GenreModel.name)) == len(genres))
+        )
+        conditions.append(MovieModel.id.in_(matching))
+    if maximum_certification:
+        subquery = select(Certification.min_age).where(
+            Certification.certification == maximum_certification
+        ).scalar_subquery()
+        conditions.append(MovieModel.certification.has(Certification.min_age <= subquery))
+    return conditions
+
+
 class MoviesRepository(ABC):
 
     @abstractmethod
@@ -62,13 +97,37 @@ class MoviesRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def export_movies(self, genres: list[str] = None, maximum_certification: str = None,
+                      batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list[dict]]:
+        """
+        Stream the whole catalog, most popular first, in batches.
+
+        Args:
+            genres (list[str], optional): Genres every movie must have.
+            maximum_certification (str, optional): The maximum certification to filter movies.
+            batch_size (int): Movies per batch.
+
+        Returns:
+            Iterator[list[dict]]: Batches of movies in the `movies_data.json` shape, without embeddings.
+
+        Raises:
+            NotImplementedError: If the source cannot export its catalog; raised on the call, before
+                any batch is requested.
+        """
+        pass
+
 class MoviesRepositoryLocal(MoviesRepository):
-    def __init__(self):
+    def __init__(self, snapshot: CatalogSnapshot = None, registry: CatalogRegistry = catalog_registry):
         self.session = SessionLocal()
+        # Embeddings are read from the memory-mapped catalog snapshot when one is available
+        self.snapshot = snapshot if snapshot is not None else open_default_snapshot()
+        # Listings are served by the in-memory catalog engine; PostgreSQL is the fallback
+        self.registry = registry
 
     async def get_popular_movies(self, pagination: Pagination) -> PaginatedResponse:
         """
-        Get a paginated list of popular movies from the local database.
+        Get a paginated list of popular movies from the in-memory catalog engine.
 
         Args:
             pagination (Pagination): Pagination parameters including page and page_size.
@@ -76,43 +135,90 @@ class MoviesRepositoryLocal(MoviesRepository):
         Returns:
             PaginatedResponse: A paginated response containing total count, current page, page size, and items.
         """
-        query = self.session.query(MovieModel).order_by(MovieModel.popularity.desc())
-        # Apply genre filtering if provided
-        if pagination.genres:
-            num_genres = len(pagination.genres)
-
-            query = (
-                query
-                .join(MovieModel.genres)
-                .filter(GenreModel.name.in_(pagination.genres))
-                .group_by(MovieModel.id)
-                .having(func.count(func.distinct(GenreModel.name)) == num_genres)
-    )
-        # Apply certification filtering if provided
-        if pagination.maximum_certification:
-            subquery = select(Certification.min_age).where(
-                Certification.certification == pagination.maximum_certification
-            ).scalar_subquery()
-            query = query.join(MovieModel.certification).filter(
-                MovieModel.certification.has(Certification.min_age <= subquery)
+        try:
+            engine = self.registry.get_index("listing", CatalogEngine)
+        except Exception as e:
+            logger.warning("catalog engine unavailable, listing from the database: %s", e)
+            return await self._get_popular_movies_from_db(pagination)
+
+        with stage("catalog_engine"):
+            total_count, records = engine.page(
+                (pagination.page - 1) * pagination.page_size,
+                pagination.page_size,
+                pagination.genres,
+                pagination.maximum_certification
             )
-        
-        total_count = query.count()
+        with stage("hydration"):
+            items = [Movie.from_record(record) for record in records]
+        return PaginatedResponse(
+            total=total_count,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            total_pages=(total_count + pagination.page_size - 1) // pagination.page_size,
+            items=items
+        )
+
+    async def _get_popular_movies_from_db(self, pagination: Pagination) -> PaginatedResponse:
+        """
+        Get a paginated list of popular movies from the local database.
+
+        Args:
+            pagination (Pagination): Pagination parameters including page and page_size.
+
+        Returns:
+            PaginatedResponse: A paginated response containing total count, current page, page size, and items.
+        """
+        # Common listings (no genre or a single one) are read from the materialized rankings
+        if len(pagination.genres) <= 1:
+            try:
+                with stage("db_query"):
+                    ranked = get_ranked_page(
+                        self.session,
+                        ranking_key(pagination.genres[0] if pagination.genres else None, pagination.maximum_certification),
+                        (pagination.page - 1) * pagination.page_size,
+                        pagination.page_size
+                    )
+            except Exception as e:
+                logger.warning("popular rankings unavailable: %s", e)
+                self.session.rollback()
+                ranked = None
+            if ranked is not None:
+                total_count, models = ranked
+                with stage("hydration"):
+                    items = Movie.from_db_model_list(models)
+                return PaginatedResponse(
+                    total=total_count,
+                    page=pagination.page,
+                    page_size=pagination.page_size,
+                    total_pages=(total_count + pagination.page_size - 1) // pagination.page_size,
+                    items=items
+                )
+
+        # Apply the genre and certification filters, shared with the catalog export
+        query = (
+            self.session.query(MovieModel)
+            .filter(*listing_conditions(pagination.genres, pagination.maximum_certification))
+            .order_by(MovieModel.popularity.desc())
+        )
+
+        with stage("db_query"):
+            total_count = query.count()
+            models = query.offset((pagination.page - 1) * pagination.page_size).limit(pagination.page_size).all()
         total_pages = (total_count + pagination.page_size - 1) // pagination.page_size
 
-        print(f"Certification filter: {pagination.maximum_certification}")
-        print(f"Genre filter: {pagination.genres}")
+        logger.debug(
+            "popular_movies source=db genres=%s maximum_certification=%s total=%d page=%d page_size=%d",
+            pagination.genres, pagination.maximum_certification, total_count, pagination.page, pagination.page_size
+        )
 
-        print(f"Fetching popular movies from local database: Total count = {total_count}, Page = {pagination.page}, Page Size = {pagination.page_size} , Total Pages = {total_pages}")
-        
-        items = query.offset((pagination.page - 1) * pagination.page_size).limit(pagination.page_size).all()
-        
+        with stage("hydration"):
+            items = Movie.from_db_model_list(models) if models else []
         return PaginatedResponse(
             total=total_count,
             page=pagination.page,
             page_size=pagination.page_size,
             total_pages=total_pages,
-            items=Movie.from_db_model_list(items) if items else []
+            items=items
         )
 
     async def get_movie_details_by_id(self, movie_id: int) -> MovieDetails:
@@ -125,9 +231,11 @@ class MoviesRepositoryLocal(MoviesRepository):
         Returns:
             Movie: An instance of the Movie class containing movie details.
         """
-        model = self.session.query(MovieModel).filter(MovieModel.id == movie_id).first()
+        with stage("db_query"):
+            model = self.session.query(MovieModel).filter(MovieModel.id == movie_id).first()
         if model:
-            return MovieDetails.from_db_model(model)
+            with stage("hydration"):
+                return MovieDetails.from_db_model(model)
         else:
             return None
         
@@ -150,9 +258,11 @@ class MoviesRepositoryLocal(MoviesRepository):
             query = query.join(MovieModel.certification).filter(
                 MovieModel.certification.has(Certification.min_age <= subquery)
             )
-        model = query.first()
+        with stage("db_query"):
+            model = query.first()
         if model:
-            return Movie.from_db_model(model)
+            with stage("hydration"):
+                return Movie.from_db_model(model)
         else:
             return None
         
@@ -166,14 +276,85 @@ class MoviesRepositoryLocal(MoviesRepository):
         Returns:
             list: A list containing the embedding of the movie.
         """
-        model = self.session.query(MovieModel).filter(MovieModel.id == movie_id).first()
+        if self.snapshot is not None:
+            with stage("embedding"):
+                embedding = self.snapshot.embedding(movie_id)
+                if embedding is not None:
+                    return embedding.tolist()
+        with stage("db_query"):
+            model = self.session.query(MovieModel).filter(MovieModel.id == movie_id).first()
         if model:
-            return eval(model.embeddings) if model.embeddings else []
+            with stage("embedding"):
+                return eval(model.embeddings) if model.embeddings else []
         else:
             raise Exception(f"Movie with ID {movie_id} not found in the local database.")
 
+    def export_movies(self, genres: list[str] = None, maximum_certification: str = None,
+                      batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list[dict]]:
+        """
+        Stream the catalog from the database through a server-side cursor, `batch_size` rows
+        per round trip, so memory stays constant whatever the catalog size.
+
+        Runs on its own session, since the export outlives the request handler, and is meant
+        to be iterated from a worker thread: every batch blocks on the database.
+
+        Args:
+            genres (list[str], optional): Genres every movie must have, as in the listing.
+            maximum_certification (str, optional): The maximum certification, as in the listing.
+            batch_size (int): Movies per batch.
+
+        Returns:
+            Iterator[list[dict]]: Batches of movies in the `movies_data.json` shape, without embeddings.
+        """
+        session = SessionLocal()
+        try:
+            statement = (
+                select(
+                    MovieModel.id, MovieModel.title, MovieModel.overview, MovieModel.release_date,
+                    MovieModel.popularity, MovieModel.vote_average, MovieModel.vote_count,
+                    MovieModel.poster_path, MovieModel.backdrop_path, Certification.certification,
+                )
+                .outerjoin(Certification, MovieModel.certification_id == Certification.id)
+                .where(*listing_conditions(genres, maximum_certification))
+                .order_by(MovieModel.popularity.desc(), MovieModel.id)
+                .execution_options(yield_per=batch_size)
+            )
+            for rows in session.execute(statement).partitions():
+                ids = [row.id for row in rows]
+                genres_by_movie = {movie_id: [] for movie_id in ids}
+                with stage("db_query"):
+                    genre_rows = session.execute(
+                        select(movie_genre.c.movie_id, GenreModel.name)
+                        .join(GenreModel, GenreModel.id == movie_genre.c.genre_id)
+                        .where(movie_genre.c.movie_id.in_(ids))
+                        .order_by(movie_genre.c.movie_id, GenreModel.name)
+                    )
+                    for movie_id, name in genre_rows:
+                        genres_by_movie[movie_id].append(name)
+                yield [
+                    {
+                        "id": row.id,
+                        "title": row.title,
+                        "overview": row.overview,
+                        "release_date": row.release_date.isoformat() if row.release_date else None,
+                        "popularity": row.popularity,
+                        "vote_average": row.vote_average,
+                        "vote_count": row.vote_count,
+                        "poster_path": row.poster_path,
+                        "backdrop_path": row.backdrop_path,
+                        "certification": row.certification,
+                        "genres": genres_by_movie[row.id],
+                    }
+                    for row in rows
+                ]
+        finally:
+            session.close()
+
 class MoviesRepositoryTMDB(MoviesRepository):
-    url = "https://api.themoviedb.org/3/"
+    def __init__(self, client: TMDBClient = None):
+        # Every instance shares one pooled, rate-limited client unless one is injected
+        self.client = client if client is not None else get_shared_tmdb_client()
+
     async def get_popular_movies(self, pagination: Pagination) -> PaginatedResponse:
         """
         Get a paginated list of popular movies from TMDB.
@@ -184,33 +365,38 @@ class MoviesRepositoryTMDB(MoviesRepository):
         Returns:
             PaginatedResponse: A paginated response containing total count, current page, page size, and items.
         """
-        # Load the API key from environment variables
-        api_key = os.getenv("TMDB_API_KEY")
-        if not api_key:
-            raise Exception("TMDB API key not found in environment variables.")
-        
-        params = {
-            "language": "es",
-            "page": pagination.page,
-            "api_key": api_key,
-        }
-        
-        response = requests.get(f"{self.url}movie/popular", params=params)
+        data = await self.client.get_json("movie/popular", {"language": "es", "page": pagination.page})
+        return PaginatedResponse(
+            total=data['total_results'],
+            page=pagination.page,
+            page_size=pagination.page_size,
+            total_pages=data['total_pages'],
+            items=MovieDetails.from_dict_list(data['results'])
+        )
 
-        print(f"Fetching popular movies from TMDB: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            return PaginatedResponse(
-                total=data['total_results'],
-                page=pagination.page,
-                page_size=pagination.page_size,
-                total_pages=data['total_pages'],
-                items=MovieDetails.from_dict_list(data['results'])
+    async def _get_movie_data(self, movie_id: int) -> dict | None:
+        """
+        Get the raw TMDB details of a movie, with its release dates, in a single request.
+
+        Args:
+            movie_id (int): The ID of the movie to retrieve.
+
+        Returns:
+            dict | None: The movie data with its US certification, or None if TMDB does not know the movie.
+        """
+        try:
+            data = await self.client.get_json(
+                f"movie/{movie_id}",
+                {"language": "es", "append_to_response": "release_dates"}
             )
-        else:
-            raise Exception(f"Error fetching popular movies: {response.status_code} - {response.text}")
-        
+        except TMDBError as e:
+            if e.status_code == 404:
+                return None
+            raise
+        data['genres'] = [genre['name'] for genre in data.get('genres', [])]
+        data['certification'] = extract_us_certification(data.get('release_dates', {})) or 'N/A'
+        return data
+
     async def get_movie_details_by_id(self, movie_id: int) -> MovieDetails:
         """
         Get a movie by its ID from TMDB.
@@ -221,26 +407,9 @@ class MoviesRepositoryTMDB(MoviesRepository):
         Returns:
             Movie: An instance of the Movie class containing movie details.
         """
-        # Load the API key from environment variables
-        api_key = os.getenv("TMDB_API_KEY")
-        if not api_key:
-            raise Exception("TMDB API key not found in environment variables.")
-        
-        params = {
-            "language": "es",
-            "api_key": api_key,
-        }
-        
-        response = requests.get(f"{self.url}movie/{movie_id}", params=params)
+        data = await self._get_movie_data(movie_id)
+        return MovieDetails.from_dict(data) if data else None
 
-        print(f"Fetching movie by ID {movie_id} from TMDB: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            return MovieDetails.from_dict(data)
-        else:
-            raise Exception(f"Error fetching movie by ID {movie_id}: {response.status_code} - {response.text}")
-        
     async def get_embedding_by_id(self, movie_id: int) -> list:
         """
         Get the embedding of a movie by its ID from TMDB.
@@ -253,34 +422,35 @@ class MoviesRepositoryTMDB(MoviesRepository):
         """
         # TMDB does not provide embeddings, so this method is not applicable.
         raise NotImplementedError("TMDB does not provide embeddings for movies.")
-    
-    async def get_movie_by_id(self, movie_id: int) -> Movie:
+
+    def export_movies(self, genres: list[str] = None, maximum_certification: str = None,
+                      batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list[dict]]:
+        """
+        Catalog exports are not supported from TMDB.
+
+        Raises:
+            NotImplementedError: Always; TMDB only exposes paginated listings capped at 500 pages.
+        """
+        raise NotImplementedError("TMDB does not support catalog exports.")
+
+    async def get_movie_by_id(self, movie_id: int, maximum_certification: str = None) -> Movie:
         """
         Get a movie by its ID from TMDB.
 
         Args:
             movie_id (int): The ID of the movie to retrieve.
+            maximum_certification (str, optional): The maximum certification to filter movies.
 
         Returns:
             Movie: An instance of the Movie class containing movie details.
         """
-        # Load the API key from environment variables
-        api_key = os.getenv("TMDB_API_KEY")
-        if not api_key:
-            raise Exception("TMDB API key not found in environment variables.")
-        
-        params = {
-            "language": "es",
-            "api_key": api_key,
-        }
-        
-        response = requests.get(f"{self.url}movie/{movie_id}", params=params)
-
-        print(f"Fetching movie by ID {movie_id} from TMDB: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            return Movie.from_dict(data)
-        else:
-            raise Exception(f"Error fetching movie by ID {movie_id}: {response.status_code} - {response.text}")
-        
\ No newline at end of file
+        data = await self._get_movie_data(movie_id)
+        if not data:
+            return None
+        if maximum_certification:
+            # Same rule as the local repository: unknown or missing certifications do not pass the filter
+            maximum_age = VALID_CERTIFICATIONS.get(maximum_certification)
+            movie_age = VALID_CERTIFICATIONS.get(data['certification'])
+            if maximum_age is None or movie_age is None or movie_age > maximum_age:
+                return None
+        return Movie.from_dict(data)
@@ -1,17 +1,73 @@
+import logging
 from abc import ABC, abstractmethod
 from models.movie import MovieDetails, MovieRecommendation
-from sentence_transformers import SentenceTransformer
-from qdrant_client import QdrantClient as QdrantClientLib
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Filter
 from repositories.movies import MoviesRepository
+from catalog.registry import CatalogRegistry, catalog_registry
+from clients.hedging import LatencyBudget, LatencyWindow, hedged
+from db.vectors import search_params, collection_quantization, QDRANT_PREFER_GRPC, QDRANT_GRPC_PORT
+from observability.metrics import stage
 import os
 import requests
 import asyncio
+import time
+import numpy as np
 
 
 MAXIMUM_MOVIES_RECOMMENDATIONS = 10
 MAXIMUM_MOVIES_CANDIDATES = 30
 THRESHOLD_SCORE = 0.50
 
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "5"))
+# Alias of the live versioned collection, swapped atomically by upload_to_qdrant.py
+QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "movies")
+# Seconds the search params derived from a collection's config are reused; the alias may move to a differently built collection
+QDRANT_CONFIG_TTL = float(os.getenv("QDRANT_CONFIG_TTL", "60"))
+# Seconds the local fallback is reused after the config could not be read, so searches do not pay a failing round trip each
+QDRANT_CONFIG_ERROR_TTL = float(os.getenv("QDRANT_CONFIG_ERROR_TTL", "5"))
+# Replica receiving hedged searches; without one, slow searches are hedged in process over the snapshot embeddings
+QDRANT_REPLICA_URL = os.getenv("QDRANT_REPLICA_URL", "")
+
+logger = logging.getLogger(__name__)
+# One async client (and so one HTTP pool or gRPC channel) per Qdrant configuration, shared by every wrapper
+_shared_clients: dict[tuple, AsyncQdrantClient] = {}
+
+
+def get_shared_qdrant_client(url: str, port: int, prefer_grpc: bool, grpc_port: int, timeout: int) -> AsyncQdrantClient:
+    """
+    Get the process-wide async Qdrant client for a configuration, creating it on first use.
+
+    Args:
+        url (str): Qdrant URL, or ":memory:" for a local in-memory instance.
+        port (int): REST port.
+        prefer_grpc (bool): Whether to use gRPC instead of REST for requests.
+        grpc_port (int): gRPC port.
+        timeout (int): Request timeout in seconds.
+
+    Returns:
+        AsyncQdrantClient: The shared client.
+    """
+    key = (url, port, prefer_grpc, grpc_port, timeout)
+    client = _shared_clients.get(key)
+    if client is None:
+        if url == ":memory:":
+            client = AsyncQdrantClient(location=url)
+        else:
+            client = AsyncQdrantClient(url=url, port=port, prefer_grpc=prefer_grpc, grpc_port=grpc_port, timeout=timeout)
+        _shared_clients[key] = client
+    return client
+
+
+async def close_shared_qdrant_clients():
+    """
+    Close every shared Qdrant client, releasing pooled connections and channels.
+    """
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    for client in clients:
+        await client.close()
+
 
 class RecommendationsRepository(ABC):
     def __init__(self, movies_repository: MoviesRepository):
@@ -24,10 +80,36 @@ class RecommendationsRepository(ABC):
 
 
 class QdrantClient:
-    def __init__(self, url: str = "http://localhost:6333", port: int = 6333):
-        self.qdrant_client = QdrantClientLib(url=url, port=port)
+    def __init__(self, url: str = "http://localhost:6333", port: int = 6333, prefer_grpc: bool = QDRANT_PREFER_GRPC,
+                 grpc_port: int = QDRANT_GRPC_PORT, timeout: int = QDRANT_TIMEOUT):
+        self.timeout = timeout
+        self.qdrant_client = get_shared_qdrant_client(url, port, prefer_grpc, grpc_port, timeout)
+        # Search params by collection, with the time they expire
+        self.collection_params: dict[str, tuple[float, object]] = {}
+
+    async def get_search_params(self, collection_name: str):
+        """
+        Get the search params of a collection: oversampling and rescoring if it is quantized.
 
-    def get_recommendations(self, collection_name: str, embedding: list[float], id: int, limit: int = 10) -> list[tuple[int, float]]:
+        They follow the quantization the live collection was built with, read from Qdrant and
+        reused for QDRANT_CONFIG_TTL seconds, not this process's QDRANT_QUANTIZATION, which may
+        differ from the loader's. If the config cannot be read, the local setting is used and
+        reused for QDRANT_CONFIG_ERROR_TTL seconds before trying again.
+        """
+        cached = self.collection_params.get(collection_name)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+        try:
+            info = await self.qdrant_client.get_collection(collection_name)
+        except Exception as e:
+            logger.warning("could not read the config of collection %s, using QDRANT_QUANTIZATION: %s", collection_name, e)
+            params, ttl = search_params(), QDRANT_CONFIG_ERROR_TTL
+        else:
+            params, ttl = search_params(collection_quantization(info)), QDRANT_CONFIG_TTL
+        self.collection_params[collection_name] = (time.monotonic() + ttl, params)
+        return params
+
+    async def get_recommendations(self, collection_name: str, embedding: list[float], id: int, limit: int = 10) -> list[tuple[int, float]]:
         """
         Get movie recommendations based on an embedding vector.
 
@@ -38,17 +120,194 @@ class QdrantClient:
         Returns:
             list[int]: A list of recommended movie IDs.
         """
-        search_result = self.qdrant_client.search(
-            collection_name=collection_name,
-            query_vector=embedding,
-            limit=limit
-        )
+        with stage("vector_search"):
+            search_result = await self.qdrant_client.search(
+                collection_name=collection_name,
+                query_vector=embedding,
+                limit=limit,
+                search_params=await self.get_search_params(collection_name),
+                with_payload=False,
+                timeout=self.timeout
+            )
         
 
         return [(result.id, result.score) for result in search_result if result.id != id and result.score > THRESHOLD_SCORE]
+
+    async def get_recommendations_by_ids(self, collection_name: str, ids: list[int], limit: int = 10,
+                                         query_filter: Filter = None) -> list[tuple[int, float]]:
+        """
+        Get the movies closest to a group of movies, using the vectors already stored in Qdrant.
+
+        Args:
+            collection_name (str): The collection (or alias) to search.
+            ids (list[int]): IDs of the example movies.
+            limit (int): The maximum number of results.
+            query_filter (Filter, optional): Payload filter the results must match.
+
+        Returns:
+            list[tuple[int, float]]: (movie ID, score) pairs, best first, excluding the examples.
+        """
+        with stage("vector_search"):
+            search_result = await self.qdrant_client.recommend(
+                collection_name=collection_name,
+                positive=ids,
+                query_filter=query_filter,
+                limit=limit,
+                search_params=await self.get_search_params(collection_name),
+                with_payload=False,
+                timeout=self.timeout
+            )
+        return [(result.id, result.score) for result in search_result]
+
+    async def search_by_vector(self, collection_name: str, vector, limit: int = 10,
+                               query_filter: Filter = None) -> list[tuple[int, float]]:
+        """
+        Get the movies closest to a query vector, e.g. the embedding of a search query.
+
+        Args:
+            collection_name (str): The collection (or alias) to search.
+            vector: The query vector.
+            limit (int): The maximum number of results.
+            query_filter (Filter, optional): Payload filter the results must match.
+
+        Returns:
+            list[tuple[int, float]]: (movie ID, score) pairs, best first.
+        """
+        with stage("vector_search"):
+            search_result = await self.qdrant_client.search(
+                collection_name=collection_name,
+                query_vector=np.asarray(vector, dtype=np.float32).tolist(),
+                query_filter=query_filter,
+                limit=limit,
+                search_params=await self.get_search_params(collection_name),
+                with_payload=False,
+                timeout=self.timeout
+            )
+        return [(result.id, result.score) for result in search_result]
     
+class HedgedVectorSearch:
+    """
+    Vector searches with a timeout, hedged when Qdrant is slower than usual.
+
+    Once a search has taken longer than the recent tail latency of its kind, the same search
+    is sent to the replica (QDRANT_REPLICA_URL) or, without one, run exactly in process over
+    the embeddings of the catalog snapshot; the first answer wins.
+    """
+
+    def __init__(self, qdrant_client: QdrantClient, registry: CatalogRegistry = catalog_registry,
+                 replica_url: str = QDRANT_REPLICA_URL):
+        self.qdrant_client = qdrant_client
+        self.replica_client = QdrantClient(url=replica_url) if replica_url else None
+        self.registry = registry
+        self.windows = {
+            "recommendations": LatencyWindow(), "recommendations_by_ids": LatencyWindow(), "search_by_vector": LatencyWindow(),
+        }
+
+    def _can_search_in_process(self) -> bool:
+        """
+        Whether the catalog held by the registry has embeddings to search; a catalog loaded from
+        the database instead of a snapshot has none.
+        """
+        try:
+            snapshot = self.registry.get()
+        except Exception as e:
+            logger.warning("catalog not available for in-process search: %s", e)
+            return False
+        return snapshot.dimension > 0 and len(snapshot) > 0
+
+    async def _search_in_process(self, vector, exclude: set, limit: int, threshold: float = None,
+                                 mask: np.ndarray = None) -> list[tuple[int, float]]:
+        snapshot = self.registry.get()
+        with stage("in_process_search"):
+            # NumPy releases the GIL in the matrix product, so the event loop keeps running
+            results = await asyncio.to_thread(snapshot.search, vector, limit + len(exclude), mask)
+        if results is None:
+            raise LookupError("the catalog snapshot has no embeddings")
+        return [
+            (movie_id, score) for movie_id, score in results
+            if movie_id not in exclude and (threshold is None or score > threshold)
+        ][:limit]
+
+    async def get_recommendations(self, embedding: list[float], id: int, limit: int, timeout: float) -> list[tuple[int, float]]:
+        """
+        Get the movies closest to an embedding, as `QdrantClient.get_recommendations`.
+
+        Raises:
+            asyncio.TimeoutError: If no search answered within `timeout` seconds.
+        """
+        def primary():
+            return self.qdrant_client.get_recommendations(QDRANT_COLLECTION, embedding, id, limit)
+
+        def backup():
+            if self.replica_client is not None:
+                return self.replica_client.get_recommendations(QDRANT_COLLECTION, embedding, id, limit)
+            return self._search_in_process(embedding, {id}, limit, THRESHOLD_SCORE)
+
+        has_backup = self.replica_client is not None or self._can_search_in_process()
+        return await hedged("recommendations", primary, backup if has_backup else None, timeout, self.windows["recommendations"])
+
+    async def get_recommendations_by_ids(self, ids: list[int], limit: int, timeout: float, query_filter: Filter = None,
+                                         mask: np.ndarray = None) -> list[tuple[int, float]]:
+        """
+        Get the movies closest to a group of movies, as `QdrantClient.get_recommendations_by_ids`.
+
+        Args:
+            query_filter (Filter, optional): Payload filter applied by Qdrant.
+            mask (np.ndarray, optional): The same filter over the snapshot rows, for the in-process search.
+
+        Raises:
+            asyncio.TimeoutError: If no search answered within `timeout` seconds.
+        """
+        def primary():
+            return self.qdrant_client.get_recommendations_by_ids(QDRANT_COLLECTION, ids, limit, query_filter)
+
+        async def in_process():
+            # Qdrant's default recommendation strategy searches with the average of the examples
+            snapshot = self.registry.get()
+            vectors = [snapshot.embedding(movie_id) for movie_id in ids]
+            vectors = [vector for vector in vectors if vector is not None]
+            if not vectors:
+                raise LookupError("the examples are not in the catalog snapshot")
+            return await self._search_in_process(np.mean(vectors, axis=0), set(ids), limit, mask=mask)
+
+        def backup():
+            if self.replica_client is not None:
+                return self.replica_client.get_recommendations_by_ids(QDRANT_COLLECTION, ids, limit, query_filter)
+            return in_process()
+
+        has_backup = self.replica_client is not None or self._can_search_in_process()
+        return await hedged("recommendations_by_ids", primary, backup if has_backup else None, timeout,
+                            self.windows["recommendations_by_ids"])
+
+    async def search_by_vector(self, vector, limit: int, timeout: float, query_filter: Filter = None,
+                               mask: np.ndarray = None) -> list[tuple[int, float]]:
+        """
+        Get the movies closest to a query vector, as `QdrantClient.search_by_vector`.
+
+        Args:
+            query_filter (Filter, optional): Payload filter applied by Qdrant.
+            mask (np.ndarray, optional): The same filter over the snapshot rows, for the in-process search.
+
+        Raises:
+            asyncio.TimeoutError: If no search answered within `timeout` seconds.
+        """
+        def primary():
+            return self.qdrant_client.search_by_vector(QDRANT_COLLECTION, vector, limit, query_filter)
+
+        def backup():
+            if self.replica_client is not None:
+                return self.replica_client.search_by_vector(QDRANT_COLLECTION, vector, limit, query_filter)
+            return self._search_in_process(vector, set(), limit, mask=mask)
+
+        has_backup = self.replica_client is not None or self._can_search_in_process()
+        return await hedged("search_by_vector", primary, backup if has_backup else None, timeout,
+                            self.windows["search_by_vector"])
+
+
 class EmbeddingClient:
     def __init__(self):
+        # sentence_transformers pulls in torch; import it only when a model is actually needed
+        from sentence_transformers import SentenceTransformer
         self.model = SentenceTransformer("all-MiniLM-L6-v2")
 
     def get_embedding(self, movie: MovieDetails) -> list[float]:
@@ -66,17 +325,44 @@ class EmbeddingClient:
 class RecommendationsRepositoryTMDB(RecommendationsRepository):
     url = "https://api.themoviedb.org/3/"
 
-    def __init__(self, movies_repository: MoviesRepository):
+    def __init__(self, movies_repository: MoviesRepository, registry: CatalogRegistry = catalog_registry):
         qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
         self.qdrant_client = QdrantClient(url=qdrant_url)
+        self.registry = registry
+        self.vector_search = HedgedVectorSearch(self.qdrant_client, registry)
         super().__init__(movies_repository)
 
-    async def get_recommendations_by_movie(self, embedding: list[float], id:int, maximum_certification: str = None) -> list[MovieRecommendation]:
+    def get_precomputed_neighbours(self, id: int, limit: int) -> list[tuple[int, float]] | None:
+        """
+        Get the neighbours of a movie precomputed in the catalog snapshot, if it has them.
+
+        Returns:
+            list[tuple[int, float]] | None: (movie ID, score) pairs, or None to search Qdrant instead.
+        """
+        try:
+            snapshot = self.registry.get()
+        except Exception as e:
+            logger.warning("catalog not available for precomputed neighbours: %s", e)
+            return None
+        with stage("neighbours"):
+            neighbours = snapshot.neighbours(id, limit)
+        if neighbours is None:
+            return None
+        return [(movie_id, score) for movie_id, score in neighbours if movie_id != id and score > THRESHOLD_SCORE]
+
+    async def get_recommendations_by_movie(self, embedding: list[float], id:int, maximum_certification: str = None,
+                                           precomputed_only: bool = False, budget: LatencyBudget = None) -> list[MovieRecommendation]:
         """
         Get a list of recommended movies based on a given movie from TMDB.
 
         Args:
             movie (Movie): The movie for which recommendations are to be fetched.
+            precomputed_only (bool): Never search Qdrant; without precomputed neighbours there are no recommendations.
+            budget (LatencyBudget, optional): Time left for the request, bounding the vector search.
+                Defaults to the Qdrant client timeout.
+
+        Raises:
+            asyncio.TimeoutError: If the vector search did not answer within the budget.
 
         Returns:
             list[Movie]: A list of recommended movies.
@@ -84,14 +370,15 @@ class RecommendationsRepositoryTMDB(RecommendationsRepository):
         
         try:
 
-            # Get recommendations from Qdrant
-            recommended_ids = self.qdrant_client.get_recommendations(
-                collection_name="movies",
-                embedding=embedding,
-                id=id,
-                limit=MAXIMUM_MOVIES_CANDIDATES
-
-            )
+            # Use the neighbours precomputed in the snapshot, or get recommendations from Qdrant
+            recommended_ids = self.get_precomputed_neighbours(id, MAXIMUM_MOVIES_CANDIDATES)
+            if recommended_ids is None and precomputed_only:
+                recommended_ids = []
+            elif recommended_ids is None:
+                recommended_ids = await self.vector_search.get_recommendations(
+                    embedding, id, MAXIMUM_MOVIES_CANDIDATES,
+                    budget.remaining() if budget is not None else self.qdrant_client.timeout
+                )
 
             # Fetch movie details from TMDB
             tasks = []
@@ -115,5 +402,7 @@ class RecommendationsRepositoryTMDB(RecommendationsRepository):
             ]
 
             return response
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching recommendations: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import threading
+import numpy as np
+from qdrant_client.models import Filter, FieldCondition, MatchAny, MatchValue
+from catalog.registry import CatalogRegistry, catalog_registry
+from catalog.snapshot import CatalogSnapshot
+from catalog.prefix_index import PrefixIndex
+from catalog.text_index import InvertedIndex, reciprocal_rank_fusion
+from models.movie import Movie, MovieSearchResult
+from repositories.recommendations import QdrantClient, HedgedVectorSearch
+from clients.hedging import LatencyBudget
+from observability.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+LEXICAL_CANDIDATES = 50
+SEMANTIC_CANDIDATES = 50
+# Top lexical hits used as examples for the semantic search when the query cannot be embedded
+SEMANTIC_SEEDS = 3
+# Model embedding search queries; it must be the one the movie vectors were built with. Empty disables query embeddings.
+SEARCH_EMBEDDING_MODEL = os.getenv("SEARCH_EMBEDDING_MODEL", "all-mpnet-base-v2")
+
+
+def precomputed_neighbours(snapshot: CatalogSnapshot, ids: list[int], limit: int) -> list[tuple[int, float]]:
+    """
+    Merge the neighbours precomputed in the snapshot for several movies, best score first.
+
+    Stands in for Qdrant's recommendation by examples when live search is unavailable or too slow.
+
+    Returns:
+        list[tuple[int, float]]: (movie ID, score) pairs excluding the examples; empty if the
+        snapshot has no neighbours.
+    """
+    best: dict[int, float] = {}
+    for movie_id in ids:
+        for neighbour, score in snapshot.neighbours(movie_id, limit) or []:
+            best[neighbour] = max(score, best.get(neighbour, score))
+    for movie_id in ids:
+        best.pop(movie_id, None)
+    return sorted(best.items(), key=lambda item: -item[1])[:limit]
+
+
+def listing_filter(snapshot: CatalogSnapshot, genres: list[str] = None, maximum_certification: str = None) -> Filter | None:
+    """
+    Translate the listing filters into a Qdrant payload filter, matching `CatalogSnapshot.filter_mask`:
+    every genre, and a certification whose minimum age is within the ceiling.
+
+    Returns:
+        Filter | None: The filter, or None if there is nothing to filter.
+    """
+    conditions = [FieldCondition(key="genres", match=MatchValue(value=genre)) for genre in sorted(set(genres or []))]
+    if maximum_certification:
+        maximum_age = snapshot.certifications.get(maximum_certification)
+        allowed = [name for name, age in snapshot.certifications.items() if maximum_age is not None and age <= maximum_age]
+        conditions.append(FieldCondition(key="certification", match=MatchAny(any=allowed)))
+    return Filter(must=conditions) if conditions else None
+
+
+class QueryEmbedder:
+    """
+    Embeds search queries with SEARCH_EMBEDDING_MODEL.
+
+    The model (and torch with it) is loaded in a background thread on first use, so neither
+    startup nor the first searches wait for it; until it is loaded, `embed` returns None.
+    `serve.py` loads it with `load` before forking instead, so workers share its weights
+    rather than each holding a copy.
+    """
+
+    def __init__(self, model_name: str = SEARCH_EMBEDDING_MODEL):
+        self.model_name = model_name
+        self.model = None
+        self.loading = False
+        self.lock = threading.Lock()
+
+    def _load(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(self.model_name)
+            logger.info("search embedding model %s loaded", self.model_name)
+        except Exception as e:
+            logger.warning("search embedding model %s not available, searching by lexical seeds: %s", self.model_name, e)
+
+    def load(self):
+        """
+        Load the model now, in the calling thread, unless it is disabled or already loading.
+        """
+        with self.lock:
+            if not self.model_name or self.loading:
+                return
+            self.loading = True
+        self._load()
+
+    async def embed(self, query: str, timeout: float) -> np.ndarray | None:
+        """
+        Embed a query, or return None if the model is disabled, still loading or too slow.
+        """
+        if not self.model_name:
+            return None
+        if self.model is None:
+            with self.lock:
+                if not self.loading:
+                    self.loading = True
+                    threading.Thread(target=self._load, name="search-embedding-model", daemon=True).start()
+            return None
+        with stage("query_embedding"):
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(self.model.encode, query), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("query embedding exceeded %.3fs", timeout)
+                return None
+
+
+query_embedder = QueryEmbedder()
+
+
+class SearchRepository:
+    """
+    Hybrid movie search: BM25 over titles and overviews fused with vector similarity.
+
+    The lexical side runs in process over the catalog held by the registry. The semantic
+    side asks Qdrant for the movies closest to the embedded query, restricted to the listing
+    filters by a payload filter, so queries without any term in common with the catalog still
+    find movies. Without a query embedding (model disabled or still loading) it falls back to
+    the movies closest to the best lexical hits.
+    """
+
+    def __init__(self, registry: CatalogRegistry = catalog_registry, qdrant_client: QdrantClient = None,
+                 embedder: QueryEmbedder = query_embedder):
+        self.registry = registry
+        self.qdrant_client = qdrant_client if qdrant_client is not None else QdrantClient(
+            url=os.getenv("QDRANT_URL", "http://localhost:6333")
+        )
+        self.vector_search = HedgedVectorSearch(self.qdrant_client, registry)
+        self.query_embedder = embedder
+
+    async def search(self, query: str, genres: list[str] = None, maximum_certification: str = None,
+                     limit: int = 20, precomputed_only: bool = False, budget: LatencyBudget = None) -> list[MovieSearchResult]:
+        """
+        Search movies by text, restricted to the listing filters.
+
+        Args:
+            query (str): Free-text query.
+            genres (list[str], optional): Genres every movie must have.
+            maximum_certification (str, optional): Highest certification allowed.
+            limit (int): Maximum number of results.
+            precomputed_only (bool): Take the semantic candidates from the neighbours precomputed in
+                the snapshot instead of searching Qdrant.
+            budget (LatencyBudget, optional): Time left for the request, bounding the semantic search.
+                Defaults to the Qdrant client timeout.
+
+        Returns:
+            list[MovieSearchResult]: The movies found, best first.
+        """
+        snapshot, index = self.registry.get_with_index("text", InvertedIndex)
+        mask = snapshot.filter_mask(genres, maximum_certification)
+
+        if not mask.any():
+            return []
+        with stage("text_search"):
+            lexical = [row for row, _ in index.search(query, mask, LEXICAL_CANDIDATES)]
+        seeds = [int(snapshot.ids[row]) for row in lexical[:SEMANTIC_SEEDS]]
+
+        def remaining() -> float:
+            return budget.remaining() if budget is not None else self.qdrant_client.timeout
+
+        neighbours = []
+        if precomputed_only:
+            with stage("neighbours"):
+                neighbours = precomputed_neighbours(snapshot, seeds, SEMANTIC_CANDIDATES)
+        else:
+            query_filter = listing_filter(snapshot, genres, maximum_certification)
+            try:
+                vector = await self.query_embedder.embed(query, remaining())
+                if vector is not None:
+                    neighbours = await self.vector_search.search_by_vector(
+                        vector, SEMANTIC_CANDIDATES, remaining(), query_filter, mask
+                    )
+                elif seeds:
+                    neighbours = await self.vector_search.get_recommendations_by_ids(
+                        seeds, SEMANTIC_CANDIDATES, remaining(), query_filter, mask
+                    )
+            except Exception as e:
+                # Lexical results alone are still a useful answer
+                logger.warning("semantic search failed, using lexical results only: %s", e)
+                neighbours = []
+        semantic = []
+        for movie_id, _ in neighbours:
+            row = snapshot.row_of(movie_id)
+            # Qdrant already applied the filter; this covers the precomputed neighbours
+            if row is not None and mask[row]:
+                semantic.append(row)
+
+        with stage("hydration"):
+            return [
+                MovieSearchResult(movie=Movie.from_snapshot(snapshot, row), score=score)
+                for row, score in reciprocal_rank_fusion([lexical, semantic])[:limit]
+            ]
+
+    def autocomplete(self, prefix: str, maximum_certification: str = None, limit: int = 10) -> list[Movie]:
+        """
+        Complete a partially typed title with the most popular matching movies.
+
+        Args:
+            prefix (str): Text typed so far; it may start at any word of the title.
+            maximum_certification (str, optional): Highest certification allowed.
+            limit (int): Maximum number of movies.
+
+        Returns:
+            list[Movie]: The matching movies, most popular first.
+        """
+        snapshot, index = self.registry.get_with_index("prefix", PrefixIndex)
+        with stage("text_search"):
+            mask = snapshot.filter_mask(None, maximum_certification) if maximum_certification else None
+            rows = index.complete(prefix, mask, limit)
+        with stage("hydration"):
+            return [Movie.from_snapshot(snapshot, row) for row in rows]
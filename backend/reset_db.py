@@ -4,29 +4,27 @@ from db.db import init_db, SessionLocal
 from db.movies import Movie, Genre, Certification
 import os
 from dotenv import load_dotenv
-from qdrant_client.models import VectorParams, Distance, HnswConfigDiff, PointStruct
 from sentence_transformers import SentenceTransformer
+from db.vectors import MOVIES_ALIAS, collection_versions, current_collection, create_movies_collection, swap_alias, delete_alias
 load_dotenv()
 
 qdrant_client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"))
 model = SentenceTransformer('all-mpnet-base-v2')
 
-print("Eliminando colección 'movies' en Qdrant...")
-if qdrant_client.collection_exists("movies"):
-    qdrant_client.delete_collection("movies")
-    print("Colección eliminada.")
-else:
-    print("No existía colección previa.")
+print(f"Eliminando colecciones '{MOVIES_ALIAS}' en Qdrant...")
+versions = collection_versions(qdrant_client, MOVIES_ALIAS)
+if current_collection(qdrant_client, MOVIES_ALIAS) is not None:
+    delete_alias(qdrant_client, MOVIES_ALIAS)
+for name in versions.values():
+    qdrant_client.delete_collection(name)
+if qdrant_client.collection_exists(MOVIES_ALIAS):
+    qdrant_client.delete_collection(MOVIES_ALIAS)
+print(f"{len(versions)} colecciones eliminadas.")
 print("Reiniciando base de datos...")
 
-qdrant_client.create_collection(
-    collection_name="movies",
-    vectors_config=VectorParams(
-        size=model.get_sentence_embedding_dimension(),
-        distance=Distance.COSINE,
-        hnsw_config=HnswConfigDiff(ef_construct=200, m=16)
-    )
-)
+collection = f"{MOVIES_ALIAS}_v1"
+create_movies_collection(qdrant_client, collection, model.get_sentence_embedding_dimension())
+swap_alias(qdrant_client, collection, MOVIES_ALIAS)
 
 
 print("Limpiando base de datos...")
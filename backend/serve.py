@@ -0,0 +1,160 @@
+from dotenv import load_dotenv
+load_dotenv()
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Without WEB_CONCURRENCY, one worker per CPU this process may run on (not the host's count,
+# which os.cpu_count() reports in containers), capped since every worker holds its own heap
+MAX_DEFAULT_WORKERS = 4
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "0")) or min(
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1, MAX_DEFAULT_WORKERS
+)
+# Connections all workers together may open; PostgreSQL allows 100 by default, the rest is left to ingestion and admin
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+# Each worker keeps one connection for the catalog change listener and one pinned by the movies
+# repository session, and needs at least one more for request queries and exports
+LISTENER_CONNECTIONS = 1
+PINNED_CONNECTIONS = 1
+MIN_CONNECTIONS_PER_WORKER = LISTENER_CONNECTIONS + PINNED_CONNECTIONS + 1
+# Workers exiting sooner than this after starting are restarted after this delay, not in a tight loop
+RESTART_DELAY = float(os.getenv("WORKER_RESTART_DELAY", "1"))
+
+logger = logging.getLogger("serve")
+
+
+def configure_pool(workers: int) -> int:
+    """
+    Size each worker's database pool so that all workers together stay under DB_MAX_CONNECTIONS.
+
+    Per worker, the catalog change listener's connection is opened outside the pool and the
+    connection pinned by the movies repository session comes from it, so the pool gets all but
+    the listener's share and is never smaller than the pinned connection plus one. The number of
+    workers is capped so that every one gets that minimum. Explicit DB_POOL_SIZE and
+    DB_MAX_OVERFLOW settings are kept, but the server refuses to start if they exceed the limit.
+
+    Returns:
+        int: The number of workers to start.
+    """
+    max_workers = max(DB_MAX_CONNECTIONS // MIN_CONNECTIONS_PER_WORKER, 1)
+    if workers > max_workers:
+        logger.warning("DB_MAX_CONNECTIONS=%d allows at most %d workers with %d connections each, starting %d instead of %d",
+                       DB_MAX_CONNECTIONS, max_workers, MIN_CONNECTIONS_PER_WORKER, max_workers, workers)
+        workers = max_workers
+    pool_connections = DB_MAX_CONNECTIONS // workers - LISTENER_CONNECTIONS
+    pool_size = max(pool_connections // 2, PINNED_CONNECTIONS + 1)
+    os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max(pool_connections - pool_size, 0)))
+
+    per_worker = int(os.environ["DB_POOL_SIZE"]) + int(os.environ["DB_MAX_OVERFLOW"]) + LISTENER_CONNECTIONS
+    if per_worker * workers > DB_MAX_CONNECTIONS:
+        raise SystemExit(
+            f"{workers} workers with DB_POOL_SIZE={os.environ['DB_POOL_SIZE']} and DB_MAX_OVERFLOW={os.environ['DB_MAX_OVERFLOW']} "
+            f"open up to {per_worker * workers} database connections, over DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}"
+        )
+    if int(os.environ["DB_POOL_SIZE"]) + int(os.environ["DB_MAX_OVERFLOW"]) <= PINNED_CONNECTIONS:
+        raise SystemExit("DB_POOL_SIZE + DB_MAX_OVERFLOW must leave at least one connection besides the movies repository session")
+    return workers
+
+
+def preload(app_module):
+    """
+    Load the catalog, build its indexes and load the search embedding model once, before
+    forking, so workers share their pages.
+
+    The snapshot arrays are memory-mapped and shared through the page cache anyway; this also
+    shares the indexes built on the heap and the model weights. Freezing the garbage collector keeps collections in the
+    workers from writing to (and so copying) the pages of these long-lived objects.
+    """
+    from catalog.registry import catalog_registry
+    from db.db import engine
+
+    start = time.perf_counter()
+    for name, builder in app_module.CATALOG_INDEXES:
+        try:
+            catalog_registry.get_index(name, builder)
+        except Exception as e:
+            logger.warning("index %s not preloaded, every worker will build it: %s", name, e)
+    from repositories.search import query_embedder
+    query_embedder.load()
+    # Connections opened while loading must not be shared by the workers
+    engine.dispose()
+    gc.collect()
+    gc.freeze()
+    logger.info("catalog preloaded in %.2fs", time.perf_counter() - start)
+
+
+def run_worker(app_module, sock: socket.socket):
+    import uvicorn
+    # Let uvicorn install its own handlers for a graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app_module.app, lifespan="on", log_level=os.getenv("LOG_LEVEL", "info").lower())
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    workers_count = configure_pool(WORKERS)
+    # Imported after the pool is configured: the database engine is created on import
+    import main as app_module
+
+    sock = socket.socket(socket.AF_INET6 if ":" in HOST else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, PORT))
+    sock.listen(2048)
+    preload(app_module)
+
+    workers: dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(app_module, sock)
+            except BaseException as e:
+                logger.exception("worker failed: %s", e)
+                code = 1
+            os._exit(code)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("serving on %s:%s with %d workers (db pool %s+%s per worker)", HOST, PORT, workers_count,
+                os.environ["DB_POOL_SIZE"], os.environ["DB_MAX_OVERFLOW"])
+    for _ in range(workers_count):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started_at = workers.pop(pid, None)
+        if stopping or started_at is None:
+            continue
+        logger.warning("worker %d exited with status %d, restarting it", pid, os.waitstatus_to_exitcode(status))
+        if time.monotonic() - started_at < RESTART_DELAY:
+            time.sleep(RESTART_DELAY)
+        spawn()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from observability.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_IN_FLIGHT, ADMISSION_WAIT, ADMISSION_SHED, DEGRADED_RESPONSES
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Longest a request may wait for a slot before it is rejected with 503
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "1.0"))
+# Queueing delay above which requests are served in degraded mode (cached or precomputed results only)
+ADMISSION_DEGRADE_AFTER = float(os.getenv("ADMISSION_DEGRADE_AFTER", "0.1"))
+# Weight of the last request in the moving averages of service time and queueing delay
+SMOOTHING = 0.1
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limiter for one endpoint class, with a bounded FIFO wait queue.
+
+    A request is rejected right away when the queue is full or when the expected wait,
+    estimated from the queue length and the average service time, exceeds `max_wait`; a
+    request that is still queued after `max_wait` is rejected too. Rejecting early keeps
+    the requests that are admitted within their latency budget instead of letting every
+    request time out together.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait: float = ADMISSION_MAX_WAIT,
+                 degrade_after: float = ADMISSION_DEGRADE_AFTER):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.degrade_after = degrade_after
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.service_time = 0.0
+        self.queue_delay = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self.waiters)
+
+    def expected_wait(self) -> float:
+        return (self.waiting + 1) / self.concurrency * self.service_time
+
+    @property
+    def degraded(self) -> bool:
+        return self.queue_delay >= self.degrade_after
+
+    def _admitted(self, wait: float) -> float:
+        self.queue_delay += SMOOTHING * (wait - self.queue_delay)
+        ADMISSION_IN_FLIGHT.set(self.in_flight, endpoint=self.name)
+        ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+        ADMISSION_WAIT.observe(wait, endpoint=self.name)
+        return wait
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            Rejected: If the request should be shed.
+        """
+        if self.in_flight < self.concurrency and not self.waiters:
+            self.in_flight += 1
+            return self._admitted(0.0)
+        if self.waiting >= self.queue_size:
+            raise Rejected("queue_full", self.expected_wait())
+        if self.expected_wait() > self.max_wait:
+            raise Rejected("deadline", self.expected_wait())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+        start = time.perf_counter()
+        try:
+            # A released slot is handed over to the waiter, so in_flight already counts it
+            await asyncio.wait_for(waiter, self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the request was cancelled: pass it on
+                self._release_slot()
+            elif waiter in self.waiters:
+                self.waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+            if isinstance(e, asyncio.TimeoutError):
+                raise Rejected("timeout", self.expected_wait())
+            raise
+        return self._admitted(time.perf_counter() - start)
+
+    def _release_slot(self):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight, endpoint=self.name)
+
+    def release(self, service_time: float):
+        self.service_time += SMOOTHING * (service_time - self.service_time)
+        self._release_slot()
+
+
+def _controller(name: str, concurrency: int, queue_size: int) -> AdmissionController:
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdmissionController(
+        name,
+        int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        int(os.getenv(f"{prefix}_QUEUE", str(queue_size))),
+    )
+
+
+def create_admission_controllers() -> dict[str, AdmissionController]:
+    """
+    Create the limiters of every endpoint class; called from the application lifespan, so they
+    belong to the event loop serving requests.
+    """
+    # Movie pages and searches wait on the database and Qdrant; the listing and autocomplete are served in memory
+    return {
+        "movie": _controller("movie", 32, 64),
+        "search": _controller("search", 16, 32),
+        "listing": _controller("listing", 64, 256),
+        "autocomplete": _controller("autocomplete", 64, 256),
+        # Exports hold a database connection and a thread for as long as the client reads
+        "export": _controller("export", 4, 8),
+    }
+
+
+# Classes whose responses are streamed from the database: they hold their slot until the body is sent
+STREAMED_CLASSES = {"export"}
+
+
+def endpoint_class(request: Request) -> str | None:
+    """
+    Classify a request into the endpoint class that limits it, or None if it is not limited.
+    """
+    path = request.url.path.rstrip("/")
+    if path == "/api/movies":
+        return "listing"
+    if path == "/api/movies/search":
+        return "search"
+    if path == "/api/movies/autocomplete":
+        return "autocomplete"
+    if path == "/api/movies/export":
+        return "export"
+    if path.startswith("/api/movies/"):
+        return "movie"
+    return None
+
+
+async def _release_after_body(body_iterator, controller: AdmissionController, start: float):
+    """
+    Pass a response body through, releasing the admission slot once it is fully sent or the
+    client went away, since a streamed response holds a database connection until then.
+    """
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        controller.release(time.perf_counter() - start)
+
+
+async def admission_middleware(request: Request, call_next):
+    """
+    Limit the concurrency of each endpoint class, shedding requests with a 503 and Retry-After
+    when they would wait too long, and flag requests that should be served in degraded mode
+    (`request.state.degraded`) when queueing delay builds up. Shed requests never reach routing,
+    so their endpoint class is recorded in `request.state.shed_endpoint` for the metrics.
+    """
+    controllers = getattr(request.app.state, "admission", None)
+    # OPTIONS requests (CORS preflights) are cheap and must not be shed ahead of the real request
+    name = endpoint_class(request) if ADMISSION_ENABLED and controllers and request.method != "OPTIONS" else None
+    if name is None:
+        return await call_next(request)
+
+    controller = controllers[name]
+    try:
+        wait = await controller.acquire()
+    except Rejected as e:
+        ADMISSION_SHED.inc(endpoint=name, reason=e.reason)
+        request.state.shed_endpoint = name
+        return JSONResponse(
+            {"detail": "The service is overloaded, retry later."},
+            status_code=503,
+            headers={"Retry-After": str(max(math.ceil(e.retry_after), 1))},
+        )
+
+    # Degraded when this request queued too long, or while the queue stays slow and is not empty
+    request.state.degraded = wait >= controller.degrade_after or (controller.degraded and controller.waiting > 0)
+    if request.state.degraded:
+        DEGRADED_RESPONSES.inc(endpoint=name)
+    start = time.perf_counter()
+    if name in STREAMED_CLASSES:
+        try:
+            response = await call_next(request)
+        except BaseException:
+            controller.release(time.perf_counter() - start)
+            raise
+        response.body_iterator = _release_after_body(response.body_iterator, controller, start)
+    else:
+        try:
+            response = await call_next(request)
+        finally:
+            controller.release(time.perf_counter() - start)
+    if request.state.degraded:
+        response.headers["X-Degraded"] = "1"
+    return response
@@ -0,0 +1,66 @@
+import os
+import threading
+from collections import OrderedDict
+from catalog.registry import CatalogRegistry, catalog_registry
+from observability.metrics import CACHE_REQUESTS
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+
+
+class VersionedCache:
+    """
+    In-process LRU cache of responses derived from the catalog.
+
+    Entries have no TTL: the cache is emptied whenever the catalog registry reports a new
+    catalog version, which ingestion runs publish to every API process. Every clear starts a
+    new generation; callers read `generation` before computing a value and pass it to `set`,
+    so a value computed from the previous catalog is not stored after the clear.
+    """
+
+    def __init__(self, name: str, registry: CatalogRegistry = catalog_registry, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        registry.subscribe(self.clear)
+
+    def get(self, key):
+        """
+        Get a cached value, or None if it is not cached.
+        """
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        CACHE_REQUESTS.inc(cache=self.name, result="miss" if value is None else "hit")
+        return value
+
+    def set(self, key, value, generation: int):
+        """
+        Cache a value computed during `generation`; dropped if the cache was cleared since.
+        """
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self, version: str = None):
+        """
+        Drop every entry, e.g. because catalog `version` was published.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.version = version
+            self.generation += 1
@@ -0,0 +1,38 @@
+import time
+
+
+class Readiness:
+    """
+    Startup state of the API process, reported by /readyz.
+
+    Each named check moves from "pending" to "ok" or "failed", and long checks report how many
+    of their steps are done. The process is ready once startup finished, even if an optional
+    check failed (the API then falls back to the database).
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.ready_at = None
+        self.checks: dict[str, str] = {}
+        self.steps: dict[str, dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def set(self, name: str, status: str):
+        self.checks[name] = status
+
+    def progress(self, name: str, done: int, total: int):
+        self.steps[name] = {"done": done, "total": total}
+
+    def mark_ready(self):
+        self.ready_at = time.time()
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "startup_seconds": round((self.ready_at or time.time()) - self.started_at, 3),
+            "checks": dict(self.checks),
+            "progress": dict(self.steps),
+        }
@@ -1,12 +1,31 @@
+import asyncio
+import logging
+import os
+from typing import Iterator
 from models.pagination import Pagination, PaginatedResponse
 from repositories.movies import MoviesRepository
 from repositories.recommendations import RecommendationsRepositoryTMDB
-from models.movie import MovieRecommendationResponse
+from repositories.search import SearchRepository
+from services.cache import VersionedCache
+from clients.hedging import LatencyBudget
+from catalog.export import encode_ndjson, encode_columnar, columnar_end, COLUMNAR_MAGIC
+from observability.metrics import EXPORTED_MOVIES
+from models.movie import MovieRecommendationResponse, MovieSearchResponse, MovieAutocompleteResponse
+
+logger = logging.getLogger(__name__)
+
+# End-to-end latency budgets in seconds, shared by the database and vector search stages of a request
+DETAIL_LATENCY_BUDGET = float(os.getenv("DETAIL_LATENCY_BUDGET", "1.0"))
+SEARCH_LATENCY_BUDGET = float(os.getenv("SEARCH_LATENCY_BUDGET", "0.5"))
 
 class MovieService:
     def __init__(self, movie_repository: MoviesRepository):
         self.movie_repository = movie_repository
         self.recommendations_repository = RecommendationsRepositoryTMDB(movie_repository)
+        self.search_repository = SearchRepository()
+        # Movie pages with their recommendations and listing pages, emptied when a new catalog version is published
+        self.response_cache = VersionedCache("movie_responses")
+        self.listing_cache = VersionedCache("listing_responses")
 
     async def get_popular_movies(self, pagination):
         """
@@ -18,28 +37,122 @@ class MovieService:
         Returns:
             PaginatedResponse: A paginated response containing total count, current page, page size, and items.
         """
-        return await self.movie_repository.get_popular_movies(pagination)
+        # The frontend sends an empty string for "no ceiling"
+        cache_key = ("listing", pagination.page, pagination.page_size, tuple(sorted(pagination.genres)),
+                     pagination.maximum_certification or None)
+        generation = self.listing_cache.generation
+        cached = self.listing_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        response = await self.movie_repository.get_popular_movies(pagination)
+        self.listing_cache.set(cache_key, response, generation)
+        return response
     
-    async def get_movie_by_id(self, movie_id: int, maximum_certification: str = None):
+    async def get_movie_by_id(self, movie_id: int, maximum_certification: str = None, degraded: bool = False):
         """
         Get a movie by its ID.
 
         Args:
             movie_id (int): The ID of the movie to retrieve.
+            degraded (bool): Serve cached or precomputed recommendations only, without searching Qdrant.
 
         Returns:
             Movie: An instance of the Movie class containing movie details.
         """
+        cache_key = ("movie", movie_id, maximum_certification or None)
+        generation = self.response_cache.generation
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        budget = LatencyBudget(DETAIL_LATENCY_BUDGET)
         try:
             movie = await self.movie_repository.get_movie_details_by_id(movie_id)
             embedding = await self.movie_repository.get_embedding_by_id(movie_id)
             if not movie:
                 raise ValueError(f"Movie with ID {movie_id} not found.")
-            recommended_movies = await self.recommendations_repository.get_recommendations_by_movie(embedding, movie_id, maximum_certification)
+            complete = True
+            try:
+                recommended_movies = await self.recommendations_repository.get_recommendations_by_movie(
+                    embedding, movie_id, maximum_certification, precomputed_only=degraded, budget=budget
+                )
+            except asyncio.TimeoutError as e:
+                # The movie itself is still worth answering within the budget
+                logger.warning("recommendations skipped for movie %s: %s", movie_id, e)
+                recommended_movies = []
+                complete = False
 
-            return MovieRecommendationResponse(
+            response = MovieRecommendationResponse(
                 results=recommended_movies,
                 searched_movie=movie
             )
+            # Degraded or timed-out responses may lack recommendations; let the next request build the full one
+            if not degraded and complete:
+                self.response_cache.set(cache_key, response, generation)
+            return response
         except Exception as e:
             raise Exception(f"Error fetching movie by ID {movie_id}: {str(e)}")
+
+    async def search_movies(self, query: str, genres: list[str] = None, maximum_certification: str = None, limit: int = 20,
+                            degraded: bool = False):
+        """
+        Search movies by title and overview.
+
+        Args:
+            query (str): Free-text query.
+            genres (list[str], optional): Genres every movie must have.
+            maximum_certification (str, optional): The maximum certification to filter movies.
+            limit (int): Maximum number of results.
+            degraded (bool): Use precomputed neighbours instead of searching Qdrant.
+
+        Returns:
+            MovieSearchResponse: The movies found, best first.
+        """
+        budget = LatencyBudget(SEARCH_LATENCY_BUDGET)
+        results = await self.search_repository.search(
+            query, genres, maximum_certification, limit, precomputed_only=degraded, budget=budget
+        )
+        return MovieSearchResponse(query=query, results=results)
+
+    async def autocomplete_movies(self, prefix: str, maximum_certification: str = None, limit: int = 10):
+        """
+        Complete a partially typed movie title.
+
+        Args:
+            prefix (str): Text typed so far.
+            maximum_certification (str, optional): The maximum certification to filter movies.
+            limit (int): Maximum number of movies.
+
+        Returns:
+            MovieAutocompleteResponse: The matching movies, most popular first.
+        """
+        results = self.search_repository.autocomplete(prefix, maximum_certification, limit)
+        return MovieAutocompleteResponse(prefix=prefix, results=results)
+
+    def export_movies(self, format: str, genres: list[str] = None, maximum_certification: str = None) -> Iterator[bytes]:
+        """
+        Stream the catalog, filtered like the listing, encoded as NDJSON or in the columnar format.
+
+        Args:
+            format (str): "ndjson" or "columnar" (see `catalog.export.encode_columnar`).
+            genres (list[str], optional): Genres every movie must have.
+            maximum_certification (str, optional): The maximum certification to filter movies.
+
+        Returns:
+            Iterator[bytes]: The encoded export, one chunk per batch of movies.
+
+        Raises:
+            NotImplementedError: If the movie repository cannot export its catalog; raised here rather
+                than once the response has started.
+        """
+        batches = self.movie_repository.export_movies(genres, maximum_certification or None)
+        return self._encode_export(format, batches)
+
+    def _encode_export(self, format: str, batches: Iterator[list[dict]]) -> Iterator[bytes]:
+        encode = encode_columnar if format == "columnar" else encode_ndjson
+        if format == "columnar":
+            yield COLUMNAR_MAGIC
+        for movies in batches:
+            yield encode(movies)
+            EXPORTED_MOVIES.inc(len(movies), format=format)
+        if format == "columnar":
+            yield columnar_end()
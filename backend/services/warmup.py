@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+from models.pagination import Pagination
+from services.health import Readiness
+from services.movies import MovieService
+
+# Most popular movies whose pages (with recommendations) are cached before the process reports ready; 0 disables it
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "0"))
+# Certification ceilings to warm, "*" meaning no ceiling
+WARMUP_CERTIFICATIONS = [
+    None if certification == "*" else certification
+    for certification in os.getenv("WARMUP_CERTIFICATIONS", "*,PG-13,R").split(",")
+]
+# First pages of the unfiltered listing to warm for every ceiling, with the page size the frontend uses
+WARMUP_PAGES = int(os.getenv("WARMUP_PAGES", "3"))
+WARMUP_PAGE_SIZE = int(os.getenv("WARMUP_PAGE_SIZE", "20"))
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "8"))
+
+logger = logging.getLogger(__name__)
+
+
+async def popular_movie_ids(movie_service: MovieService, count: int, page_size: int = 100) -> list[int]:
+    """
+    Get the IDs of the `count` most popular movies through the listing.
+    """
+    ids = []
+    page = 1
+    while len(ids) < count:
+        response = await movie_service.get_popular_movies(Pagination(page=page, page_size=page_size, genres=[]))
+        ids.extend(movie.id for movie in response.items)
+        if page >= response.total_pages:
+            break
+        page += 1
+    return ids[:count]
+
+
+async def warm_up_popular(movie_service: MovieService, readiness: Readiness, top_n: int = WARMUP_TOP_N,
+                          certifications: list = WARMUP_CERTIFICATIONS, pages: int = WARMUP_PAGES,
+                          concurrency: int = WARMUP_CONCURRENCY):
+    """
+    Fill the response caches with the first listing pages and the pages of the most popular
+    movies, for every certification ceiling, running at most `concurrency` requests at a time.
+
+    Progress is reported through `readiness` under the "warmup" check. Failed requests are
+    counted and logged but do not stop the warm-up.
+
+    Args:
+        movie_service (MovieService): The service whose caches are filled.
+        readiness (Readiness): Readiness state the progress is reported to.
+        top_n (int): Number of popular movies to warm.
+        certifications (list): Certification ceilings, None meaning no ceiling.
+        pages (int): Number of listing pages to warm per ceiling.
+        concurrency (int): Maximum number of requests in flight.
+    """
+    readiness.set("warmup", "pending")
+    try:
+        movie_ids = await popular_movie_ids(movie_service, top_n)
+    except Exception as e:
+        logger.warning("warm-up skipped, popular movies not available: %s", e)
+        readiness.set("warmup", "failed")
+        return
+
+    requests = [
+        movie_service.get_popular_movies(Pagination(
+            page=page, page_size=WARMUP_PAGE_SIZE, genres=[], maximum_certification=certification
+        ))
+        for certification in certifications for page in range(1, pages + 1)
+    ]
+    requests += [
+        movie_service.get_movie_by_id(movie_id, certification)
+        for movie_id in movie_ids for certification in certifications
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+    done = failed = 0
+    readiness.progress("warmup", done, len(requests))
+
+    async def run(request):
+        nonlocal done, failed
+        async with semaphore:
+            try:
+                await request
+            except Exception as e:
+                failed += 1
+                logger.debug("warm-up request failed: %s", e)
+        done += 1
+        readiness.progress("warmup", done, len(requests))
+
+    await asyncio.gather(*(run(request) for request in requests))
+    if failed:
+        logger.warning("warm-up finished with %d of %d requests failed", failed, len(requests))
+    readiness.set("warmup", "failed" if requests and failed == len(requests) else "ok")
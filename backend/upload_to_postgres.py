@@ -1,8 +1,13 @@
 import json
 import os
+from datetime import date
+import numpy as np
 from sqlalchemy import text
 from db.db import init_db, SessionLocal
 from db.movies import Movie, Genre, Certification
+from db.rankings import refresh_popular_rankings
+from catalog.registry import publish_catalog
+from catalog.snapshot import load_movies
 
 INPUT_FILE = "movies_data.json"
 
@@ -18,6 +23,12 @@ VALID_CERTIFICATIONS = {
     "TV-MA": 18,
 }
 
+def embedding_text(embedding) -> str:
+    # Embeddings are stored as the text of a JSON list; rows read from the snapshot are NumPy arrays
+    if embedding is None:
+        return None
+    return json.dumps(np.asarray(embedding, dtype=float).tolist())
+
 def upload_movies_to_postgres(movies):
     init_db()
     session = SessionLocal()
@@ -54,14 +65,14 @@ def upload_movies_to_postgres(movies):
                 id=movie['id'],
                 title=movie['title'],
                 overview=movie['overview'],
-                release_date=movie['release_date'],
+                release_date=date.fromisoformat(movie['release_date']) if movie['release_date'] else None,
                 popularity=movie['popularity'],
                 vote_average=movie['vote_average'],
                 vote_count=movie['vote_count'],
                 poster_path=movie['poster_path'],
                 backdrop_path=movie['backdrop_path'],
                 certification=cert_obj,
-                embeddings=str(movie['embeddings'])  # Puede ser array también, depende del tipo de columna
+                embeddings=embedding_text(movie['embeddings'])
             )
 
             for genre_name in movie['genres']:
@@ -82,9 +93,15 @@ def upload_movies_to_postgres(movies):
 
     print(f"Se cargaron {len(movies)} películas a PostgreSQL.")
 
+    print("Actualizando rankings de popularidad...")
+    listings = refresh_popular_rankings(session)
+    print(f"Se materializaron {listings} listados.")
+    version = publish_catalog(session, "upload_to_postgres")
+    print(f"Versión del catálogo publicada: {version}")
+    session.close()
+
 def main():
-    with open(INPUT_FILE, encoding='utf-8') as f:
-        movies = json.load(f)
+    movies = load_movies(INPUT_FILE)
     upload_movies_to_postgres(movies)
 
 if __name__ == "__main__":
@@ -1,63 +1,192 @@
 import json
 import os
+import sys
+import time
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, HnswConfigDiff, PointStruct
+from qdrant_client.models import CollectionStatus
+from catalog.snapshot import snapshot_for
+from db.vectors import (
+    MOVIES_ALIAS, create_movies_collection, next_collection_name, swap_alias, rollback_alias,
+    prune_versions, sample_recall, search_params, estimate_memory, QDRANT_QUANTIZATION,
+    QDRANT_PREFER_GRPC, QDRANT_GRPC_PORT,
+)
 from dotenv import load_dotenv
 load_dotenv()
 
 QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
-print(f"Conectando a Qdrant en {QDRANT_URL}")
+print(f"Conectando a Qdrant en {QDRANT_URL} (gRPC: {QDRANT_PREFER_GRPC})")
 INPUT_FILE = "movies_data.json"
 
-def upload_to_qdrant(movies):
-    client = QdrantClient(url=QDRANT_URL)
-    collection = "movies"
+BATCH_SIZE = int(os.getenv("QDRANT_UPLOAD_BATCH_SIZE", "256"))
+PARALLEL = int(os.getenv("QDRANT_UPLOAD_PARALLEL", "4"))
+CONSISTENCY_TIMEOUT = float(os.getenv("QDRANT_UPLOAD_TIMEOUT", "300"))
+MIN_RECALL = float(os.getenv("QDRANT_MIN_RECALL", "0.9"))
+RECALL_SAMPLE_SIZE = int(os.getenv("QDRANT_RECALL_SAMPLE", "100"))
 
-    if client.collection_exists(collection):
-        client.delete_collection(collection)
-        print("Colección existente eliminada.")
-
-    client.create_collection(
-        collection_name=collection,
-        vectors_config=VectorParams(
-            size=len(movies[0]['embeddings']),
-            distance=Distance.COSINE,
-            hnsw_config=HnswConfigDiff(ef_construct=200, m=16)
-        )
-    )
+def get_client():
+    return QdrantClient(location=QDRANT_URL, prefer_grpc=QDRANT_PREFER_GRPC, grpc_port=QDRANT_GRPC_PORT)
+
+def prepare_points(movies):
+    """
+    Turn movie dictionaries into ids, a contiguous float32 vector matrix and payloads.
 
-    print("Subiendo puntos a Qdrant...")
-    batch = []
-    ids = set()
+    Args:
+        movies (list): Movies in the `movies_data.json` shape.
+
+    Returns:
+        tuple: The list of ids, the (n, dim) float32 matrix and the list of payloads.
+    """
+    ids, vectors, payloads = [], [], []
+    seen = set()
     for movie in movies:
-        if movie['id'] in ids:
+        if movie['id'] in seen:
             print(f"[WARN] ID duplicado encontrado: {movie['id']}")
             continue
-        ids.add(movie['id'])
-        batch.append(
-            PointStruct(
-                id=movie['id'],
-                vector=movie['embeddings'],
-                payload={
-                    'title': movie['title'],
-                    'genres': movie['genres'],
-                    'certification': movie['certification']
-                }
-            )
+        seen.add(movie['id'])
+        ids.append(movie['id'])
+        vectors.append(movie['embeddings'])
+        payloads.append({
+            'title': movie['title'],
+            'genres': movie['genres'],
+            'certification': movie['certification']
+        })
+    return ids, np.ascontiguousarray(vectors, dtype=np.float32), payloads
+
+def prepare_points_from_snapshot(snapshot):
+    """
+    Same as `prepare_points`, reading the memory-mapped snapshot without copying the vectors.
+    """
+    ids = snapshot.ids.tolist()
+    payloads = [
+        {
+            'title': snapshot.columns['title'][row],
+            'genres': snapshot.genre_names(row),
+            'certification': snapshot.certification(row)
+        }
+        for row in range(len(snapshot))
+    ]
+    return ids, snapshot.embeddings, payloads
+
+def wait_until_consistent(client, collection, expected, timeout=CONSISTENCY_TIMEOUT):
+    """
+    Wait for non-blocking writes to be applied and check the collection holds every point.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection (str): Name of the collection.
+        expected (int): Number of points that were uploaded.
+        timeout (float): Seconds to wait before giving up.
+
+    Returns:
+        int: The exact number of points in the collection.
+    """
+    deadline = time.time() + timeout
+    while True:
+        count = client.count(collection_name=collection, exact=True).count
+        status = client.get_collection(collection).status
+        if count >= expected and status == CollectionStatus.GREEN:
+            return count
+        if time.time() > deadline:
+            raise Exception(f"La colección {collection} tiene {count}/{expected} puntos (estado {status}) tras {timeout}s")
+        time.sleep(0.5)
+
+def upload_to_qdrant(ids, vectors, payloads, batch_size=BATCH_SIZE, parallel=PARALLEL):
+    """
+    Build a new version of the movies collection, validate it and swap the alias to it.
+
+    The live collection keeps serving searches until the new one is complete and its
+    recall on a sample of exact nearest-neighbour queries reaches QDRANT_MIN_RECALL.
+    """
+    client = get_client()
+    collection = next_collection_name(client, MOVIES_ALIAS)
+    print(f"Construyendo la colección {collection} (cuantización: {QDRANT_QUANTIZATION})...")
+    create_movies_collection(client, collection, vectors.shape[1])
+
+    try:
+        print(f"Subiendo {len(ids)} puntos a Qdrant (lotes de {batch_size}, {parallel} en paralelo)...")
+        start_time = time.time()
+        client.upload_collection(
+            collection_name=collection,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=parallel,
+            max_retries=3,
+            wait=False
+        )
+        sent_time = time.time()
+        count = wait_until_consistent(client, collection, len(ids))
+        end_time = time.time()
+
+        stats = {
+            'points': count,
+            'send_seconds': sent_time - start_time,
+            'total_seconds': end_time - start_time,
+            'points_per_second': count / (end_time - start_time) if end_time > start_time else 0.0,
+        }
+        print(
+            f"Subida completada. Total: {count} puntos en {stats['total_seconds']:.2f}s "
+            f"(envío {stats['send_seconds']:.2f}s, {stats['points_per_second']:.0f} puntos/s)"
         )
-        if len(batch) >= 100:
-            client.upsert(collection_name=collection, points=batch)
-            batch = []
 
-    if batch:
-        client.upsert(collection_name=collection, points=batch)
+        stats['recall'] = sample_recall(client, collection, ids, vectors, sample_size=RECALL_SAMPLE_SIZE, params=search_params())
+        stats['memory'] = estimate_memory(len(ids), vectors.shape[1])
+        print(
+            f"Recall@10 sobre {RECALL_SAMPLE_SIZE} consultas: {stats['recall']:.3f}, "
+            f"RAM estimada: {stats['memory']['ram_bytes'] / 2**20:.1f} MiB"
+        )
+        if stats['recall'] < MIN_RECALL:
+            raise Exception(
+                f"La colección {collection} no alcanza el recall mínimo ({stats['recall']:.3f} < {MIN_RECALL}); "
+                f"el alias '{MOVIES_ALIAS}' sigue apuntando a la versión anterior."
+            )
+    except BaseException:
+        # A rejected or interrupted build must not hold memory nor count among the versions kept for rollback
+        print(f"[WARN] Eliminando la colección {collection}, que no llegó a publicarse.")
+        client.delete_collection(collection)
+        raise
+
+    previous = swap_alias(client, collection, MOVIES_ALIAS)
+    print(f"Alias '{MOVIES_ALIAS}' -> {collection} (antes: {previous})")
+    for deleted in prune_versions(client, MOVIES_ALIAS):
+        print(f"Versión antigua eliminada: {deleted}")
+    stats['collection'] = collection
+    return stats
 
-    print(f"Subida completada. Total: {len(movies)}")
+def publish_catalog_version(source: str):
+    """
+    Tell the running API processes that the vectors changed, so they drop cached recommendations.
+    Skipped when no database is configured.
+    """
+    if not os.getenv("DATABASE_URL"):
+        return
+    try:
+        from db.db import SessionLocal
+        from db.versions import bump_catalog_version
+        session = SessionLocal()
+        try:
+            print(f"Versión del catálogo publicada: {bump_catalog_version(session, source)}")
+        finally:
+            session.close()
+    except Exception as e:
+        print(f"[WARN] No se pudo publicar la versión del catálogo: {e}")
 
 def main():
-    with open(INPUT_FILE, encoding='utf-8') as f:
-        movies = json.load(f)
-    upload_to_qdrant(movies)
+    if len(sys.argv) > 1 and sys.argv[1] == "rollback":
+        target = rollback_alias(get_client(), MOVIES_ALIAS)
+        print(f"Alias '{MOVIES_ALIAS}' -> {target}")
+        publish_catalog_version("upload_to_qdrant rollback")
+        return
+    snapshot = snapshot_for(INPUT_FILE)
+    if snapshot is not None:
+        ids, vectors, payloads = prepare_points_from_snapshot(snapshot)
+    else:
+        with open(INPUT_FILE, encoding='utf-8') as f:
+            ids, vectors, payloads = prepare_points(json.load(f))
+    upload_to_qdrant(ids, vectors, payloads)
+    publish_catalog_version("upload_to_qdrant")
 
 if __name__ == "__main__":
     main()